@@ -113,6 +113,12 @@ class Plugin(PluginBase):
             command=self.timelineService.add_moonphase,
         )
 
+        label = _('Check for character overlaps')
+        self.pluginMenu.add_command(
+            label=label,
+            command=self.timelineService.check_overlaps,
+        )
+
         self.pluginMenu.add_separator()
 
         label = _('Open Aeon Timeline 2')
@@ -4,15 +4,54 @@ Copyright (c) Peter Triesberger
 For further information see https://github.com/peter88213/nv_aeon2
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
-import codecs
+import copy
 from json import JSONDecodeError
 import json
 import os
+import shutil
+import struct
+import time
 import zipfile
 
+from nvaeon2.json_stream_reader import JsonStreamReader
+from nvaeon2.lazy_event_list import LazyEventList
 from nvaeon2.nvaeon2_locale import _
 from nvlib.novx_globals import norm_path
 
+RAW_COPY_ATTRIBUTES = (
+    '_FH_EXTRA_FIELD_LENGTH',
+    '_FH_FILENAME_LENGTH',
+    '_strip_extra',
+    'sizeFileHeader',
+    'structFileHeader',
+)
+# zipfile internals required for copying compressed members as they are
+
+
+def iter_timeline(filePath):
+    """Unzip the project file and parse 'timeline.json' incrementally.
+
+    Positional arguments:
+        filePath -- Path of the .aeon project file to read.
+
+    Generate (key, value) tuples of the timeline structure's top level,
+    e.g. "entities", "events", and "template".
+    The JSON data is decoded directly from the compressed stream,
+    so the whole JSON text is never held in memory.
+    Raise the "RuntimeError" exception in case of error. 
+    """
+    try:
+        with zipfile.ZipFile(filePath, 'r') as myzip:
+            with myzip.open('timeline.json') as jsonStream:
+                yield from JsonStreamReader(jsonStream).items()
+    except GeneratorExit:
+        raise
+
+    except JSONDecodeError:
+        raise RuntimeError(f'{_("Invalid JSON data in timeline")}.')
+    except:
+        raise RuntimeError(f'{_("Cannot read timeline data")}.')
+
 
 def open_timeline(filePath):
     """Unzip the project file and read 'timeline.json'.
@@ -23,30 +62,73 @@ def open_timeline(filePath):
     Return a Python object containing the timeline structure.
     Raise the "RuntimeError" exception in case of error. 
     """
+    jsonData = {}
+    for key, value in iter_timeline(filePath):
+        jsonData[key] = value
+    if not jsonData:
+        raise RuntimeError(f'{_("No JSON part found in timeline data")}.')
+
+    return jsonData
+
+
+def open_timeline_lazy(filePath):
+    """Unzip the project file and index 'timeline.json'.
+
+    Positional arguments:
+        filePath -- Path of the .aeon project file to read.
+
+    Return a Python object containing the timeline structure.
+    The events are not parsed in advance; "events" is a LazyEventList
+    that parses an event each time it is accessed.
+    Use this for read-only operations that need only a few events.
+    Raise the "RuntimeError" exception in case of error. 
+    """
     try:
         with zipfile.ZipFile(filePath, 'r') as myzip:
             jsonBytes = myzip.read('timeline.json')
-            jsonStr = codecs.decode(jsonBytes, encoding='utf-8')
+        jsonData = _parse_lazily(jsonBytes)
+    except JSONDecodeError:
+        raise RuntimeError(f'{_("Invalid JSON data in timeline")}.')
     except:
         raise RuntimeError(f'{_("Cannot read timeline data")}.')
-    if not jsonStr:
+
+    if not jsonData:
         raise RuntimeError(f'{_("No JSON part found in timeline data")}.')
-    try:
-        jsonData = json.loads(jsonStr)
-    except JSONDecodeError:
-        raise RuntimeError(f'{_("Invalid JSON data in timeline")}.')
+
     return jsonData
 
 
-def save_timeline(jsonData, filePath):
+def save_timeline(
+        jsonData,
+        filePath,
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=None,
+):
     """Write the timeline to a zipfile located at filePath.
     
     Positional arguments:
         jsonData -- Python object containing the timeline structure.
         filePath -- Path of the .aeon project file to write.
         
+    Optional arguments:
+        compression -- zipfile compression method for 'timeline.json'.
+        compresslevel: int -- compression level; None means default.
+        
+    Return True if the file is written.
+    Return False if the file already contains the same JSON data.
     Raise the "RuntimeError" exception in case of error. 
     """
+    try:
+        if _timeline_is_unchanged(
+            _encode_json(jsonData),
+            filePath,
+            compression,
+        ):
+            return False
+
+    except:
+        raise RuntimeError(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
+
     backedUp = False
     if os.path.isfile(filePath):
         try:
@@ -62,11 +144,270 @@ def save_timeline(jsonData, filePath):
         with zipfile.ZipFile(
             filePath,
             'w',
-            compression=zipfile.ZIP_DEFLATED
+            compression=compression,
+            compresslevel=compresslevel,
         ) as f:
-            f.writestr('timeline.json', json.dumps(jsonData))
+            zinfo = zipfile.ZipInfo(
+                'timeline.json',
+                date_time=time.localtime()[:6],
+            )
+            # the current time, like ZipFile.writestr()
+            zinfo.compress_type = compression
+            zinfo._compresslevel = compresslevel
+            # ZipFile.open() does not apply the archive's level to a ZipInfo;
+            # Python 3.13 calls this attribute "compress_level"
+            # and keeps the old name as an alias.
+            with f.open(zinfo, 'w') as jsonStream:
+                for jsonBlock in _encode_json(jsonData):
+                    jsonStream.write(jsonBlock)
+            if backedUp:
+                # Carry over all other members,
+                # if possible without recompressing them.
+                if _can_copy_raw(f):
+                    copy_member = _copy_member
+                else:
+                    copy_member = _recompress_member
+                with zipfile.ZipFile(f'{filePath}.bak', 'r') as original:
+                    for member in original.infolist():
+                        if member.filename != 'timeline.json':
+                            copy_member(original, f, member)
     except:
         if backedUp:
             os.replace(f'{filePath}.bak', filePath)
         raise RuntimeError(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
 
+    return True
+
+
+def _can_copy_raw(targetZip):
+    """Return True if _copy_member() can write to targetZip.
+    
+    _copy_member() relies on zipfile internals 
+    that may change with the Python version.
+    """
+    for attribute in RAW_COPY_ATTRIBUTES:
+        if not hasattr(zipfile, attribute):
+            return False
+
+    for attribute in ('fp', 'filelist', 'NameToInfo', 'start_dir'):
+        if not hasattr(targetZip, attribute):
+            return False
+
+    return hasattr(zipfile.ZipInfo, 'FileHeader')
+
+
+def _copy_member(sourceZip, targetZip, zinfo):
+    """Copy a zip member's compressed data as it is.
+    
+    Positional arguments:
+        sourceZip -- ZipFile instance open for reading.
+        targetZip -- ZipFile instance open for writing.
+        zinfo -- ZipInfo instance of the sourceZip member to copy.
+    
+    Note: The zipfile module has no public API for raw copying,
+    so the local file header is rebuilt here the same way 
+    ZipFile.write() does. Call _can_copy_raw() first.
+    """
+    # Skip the source's local file header.
+    sourceZip.fp.seek(zinfo.header_offset)
+    fileHeader = struct.unpack(
+        zipfile.structFileHeader,
+        sourceZip.fp.read(zipfile.sizeFileHeader)
+    )
+    sourceZip.fp.seek(
+        fileHeader[zipfile._FH_FILENAME_LENGTH]
+        +fileHeader[zipfile._FH_EXTRA_FIELD_LENGTH],
+        os.SEEK_CUR
+    )
+
+    # Write the target's local file header.
+    newInfo = copy.copy(zinfo)
+    newInfo.extra = zipfile._strip_extra(zinfo.extra, (1,))
+    # the ZIP64 extra field is regenerated on writing
+    newInfo.header_offset = targetZip.fp.tell()
+    zip64 = (
+        zinfo.file_size > zipfile.ZIP64_LIMIT
+        or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    )
+    targetZip.fp.write(newInfo.FileHeader(zip64))
+
+    # Copy the compressed data.
+    remaining = zinfo.compress_size
+    while remaining > 0:
+        chunk = sourceZip.fp.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise EOFError
+
+        targetZip.fp.write(chunk)
+        remaining -= len(chunk)
+    if newInfo.flag_bits & 0x08:
+        # Write the data descriptor.
+        if zip64:
+            fmt = '<LLQQ'
+        else:
+            fmt = '<LLLL'
+        targetZip.fp.write(struct.pack(
+            fmt,
+            0x08074b50,
+            newInfo.CRC,
+            newInfo.compress_size,
+            newInfo.file_size
+        ))
+    targetZip.filelist.append(newInfo)
+    targetZip.NameToInfo[newInfo.filename] = newInfo
+    targetZip.start_dir = targetZip.fp.tell()
+
+
+def _encode_json(jsonData, blockSize=65536):
+    """Generate the serialized JSON data as bytes blocks.
+    
+    Positional arguments:
+        jsonData -- Python object containing the timeline structure.
+    
+    Optional arguments:
+        blockSize: int -- minimum size of the generated blocks.
+    
+    The top level object is encoded member by member, and top level
+    arrays are encoded element by element, using compact separators. 
+    This way, the JSON text is never held in memory as a whole.
+    The top level array elements are separated by line breaks, 
+    and the closing brackets are on lines of their own, so the 
+    JsonStreamReader can decode the elements in batches, and the 
+    LazyEventList can find them without decoding.
+    """
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    parts = []
+    partsSize = 0
+    for part in _iter_json_parts(jsonData, encode):
+        parts.append(part)
+        partsSize += len(part)
+        if partsSize >= blockSize:
+            yield ''.join(parts).encode('utf-8')
+            parts = []
+            partsSize = 0
+    if parts:
+        yield ''.join(parts).encode('utf-8')
+
+
+def _iter_json_parts(jsonData, encode):
+    """Generate the JSON text of jsonData piece by piece."""
+    yield '{'
+    separator = ''
+    for key, value in jsonData.items():
+        yield f'{separator}{encode(key)}:'
+        separator = ','
+        if isinstance(value, list):
+            yield '['
+            elementSeparator = ''
+            for element in value:
+                yield f'{elementSeparator}{encode(element)}'
+                elementSeparator = ',\n'
+            if value:
+                yield '\n'
+            yield ']'
+        else:
+            yield encode(value)
+    yield '}'
+
+
+def _parse_lazily(jsonBytes):
+    """Return the top level JSON object with a lazy "events" list."""
+    text = jsonBytes.decode('utf-8')
+    decoder = json.JSONDecoder()
+    whitespace = LazyEventList.WHITESPACE
+    jsonData = {}
+    pos = whitespace.match(text).end()
+    if pos == len(text):
+        return jsonData
+
+    if not text.startswith('{', pos):
+        raise JSONDecodeError("Expecting '{'", text, pos)
+
+    pos = whitespace.match(text, pos + 1).end()
+    if text.startswith('}', pos):
+        return jsonData
+
+    while True:
+        key, pos = decoder.raw_decode(text, pos)
+        pos = whitespace.match(text, pos).end()
+        if not text.startswith(':', pos):
+            raise JSONDecodeError("Expecting ':' delimiter", text, pos)
+
+        pos = whitespace.match(text, pos + 1).end()
+        if key == 'events':
+            value = LazyEventList(text, pos, jsonBytes)
+            pos = value.end
+        else:
+            value, pos = decoder.raw_decode(text, pos)
+        jsonData[key] = value
+        pos = whitespace.match(text, pos).end()
+        if text.startswith('}', pos):
+            return jsonData
+
+        if not text.startswith(',', pos):
+            raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+
+        pos = whitespace.match(text, pos + 1).end()
+
+
+def _recompress_member(sourceZip, targetZip, zinfo):
+    """Copy a zip member by decompressing and compressing it again.
+    
+    Positional arguments:
+        sourceZip -- ZipFile instance open for reading.
+        targetZip -- ZipFile instance open for writing.
+        zinfo -- ZipInfo instance of the sourceZip member to copy.
+    """
+    newInfo = zipfile.ZipInfo(zinfo.filename, date_time=zinfo.date_time)
+    newInfo.compress_type = zinfo.compress_type
+    newInfo.comment = zinfo.comment
+    newInfo.create_system = zinfo.create_system
+    newInfo.external_attr = zinfo.external_attr
+    with sourceZip.open(zinfo) as source:
+        with targetZip.open(newInfo, 'w') as target:
+            shutil.copyfileobj(source, target, 1 << 20)
+
+
+def _timeline_is_unchanged(jsonBlocks, filePath, compression):
+    """Return True if the timeline file already contains the JSON data.
+    
+    Positional arguments:
+        jsonBlocks -- iterator of the serialized JSON data's bytes blocks.
+        filePath -- Path of the .aeon project file to compare.
+        compression -- zipfile compression method requested for writing.
+        
+    Compare the serialized JSON data block by block with the 
+    existing 'timeline.json' member, and stop at the first difference.
+    The blocks are not kept, so memory use does not depend 
+    on the size of the JSON data.
+    Raise an exception only if the JSON data cannot be serialized.
+    """
+    try:
+        myzip = zipfile.ZipFile(filePath, 'r')
+    except:
+        return False
+
+    with myzip:
+        try:
+            zinfo = myzip.getinfo('timeline.json')
+            if zinfo.compress_type != compression:
+                return False
+
+            jsonStream = myzip.open(zinfo)
+        except:
+            return False
+
+        with jsonStream:
+            for jsonBlock in jsonBlocks:
+                try:
+                    if jsonStream.read(len(jsonBlock)) != jsonBlock:
+                        return False
+
+                except:
+                    return False
+
+            try:
+                return not jsonStream.read(1)
+
+            except:
+                return False
@@ -12,6 +12,8 @@ from tkinter import filedialog
 from nvaeon2.json_timeline2 import JsonTimeline2
 from nvaeon2.narrative_missing import NarrativeMissing
 from nvaeon2.nvaeon2_locale import _
+from nvaeon2.sync_map import SyncMap
+from nvaeon2.timeline_cache import TimelineCache
 from nvlib.controller.services.service_base import ServiceBase
 from nvlib.model.file.doc_open import open_document
 from nvlib.novx_globals import norm_path
@@ -36,15 +38,22 @@ class At2Service(ServiceBase):
         role_location='Location',
         color_section='Red',
         color_event='Yellow',
+        compression_level='6',
     )
     OPTIONS = dict(
         add_moonphase=False,
         lock_on_export=False,
+        compress_timeline=True,
+        show_event_count=False,
     )
+    OVERLAPS_SHOWN = 20
+    # maximum number of overlaps listed in the message box
 
     def __init__(self, model, view, controller, windowTitle):
         super().__init__(model, view, controller)
         self.windowTitle = windowTitle
+        self._timelineCache = TimelineCache()
+        # parsed timelines are reused as long as the file is unchanged
 
     def add_moonphase(self):
         """Add/update moon phase data.
@@ -87,17 +96,79 @@ class At2Service(ServiceBase):
         kwargs.update(configuration.options)
         kwargs['add_moonphase'] = True
         kwargs['nv_service'] = self._mdl.nvService
+        kwargs['timeline_cache'] = self._timelineCache
         timeline = JsonTimeline2(timelinePath, **kwargs)
-        timeline.novel = self._mdl.nvService.new_novel()
         try:
-            timeline.read()
-            timeline.write(timeline.novel)
+            timeline.update_moon_phases()
         except RuntimeError as ex:
             message = f'!{str(ex)}'
         else:
-            message = f'{_("File written")}: "{norm_path(timeline.filePath)}".'
+            if timeline.upToDate:
+                message = (
+                    f'{_("File is already up to date")}: '
+                    f'"{norm_path(timeline.filePath)}".'
+                )
+            else:
+                message = (
+                    f'{_("File written")}: '
+                    f'"{norm_path(timeline.filePath)}".'
+                )
         self._ui.set_status(message)
 
+    def check_overlaps(self):
+        """List the characters at different locations at the same time."""
+        self._ui.restore_status()
+        if not self._mdl.prjFile:
+            return
+
+        timelinePath = (
+            f'{os.path.splitext(self._mdl.prjFile.filePath)[0]}'
+            f'{JsonTimeline2.EXTENSION}'
+        )
+        if not os.path.isfile(timelinePath):
+            self._ui.set_status(
+                _('!No {} file available for this project.').format(
+                    self.windowTitle
+                )
+            )
+            return
+
+        kwargs = self._get_configuration(timelinePath)
+        kwargs['nv_service'] = self._mdl.nvService
+        kwargs['timeline_cache'] = self._timelineCache
+        timeline = JsonTimeline2(timelinePath, **kwargs)
+        try:
+            overlaps = timeline.check_overlaps()
+        except RuntimeError as ex:
+            self._ui.set_status(f'!{str(ex)}')
+            return
+
+        if not overlaps:
+            self._ui.show_info(
+                message=self.windowTitle,
+                detail=_('No character overlaps found.'),
+                title=_('Character overlaps'),
+            )
+            return
+
+        lines = [
+            f'{characterName}: "{title}" / "{otherTitle}"'
+            for characterName, title, otherTitle in overlaps[
+                :self.OVERLAPS_SHOWN
+            ]
+        ]
+        if len(overlaps) > self.OVERLAPS_SHOWN:
+            lines.append(
+                _('... and {} more.').format(
+                    len(overlaps) - self.OVERLAPS_SHOWN
+                )
+            )
+        self._ui.show_info(
+            message=_('{} character overlaps found.').format(len(overlaps)),
+            detail='\n'.join(lines),
+            title=_('Character overlaps'),
+        )
+
     def create_novx(self):
         """Create a novelibre project from a timeline."""
         self._ui.restore_status()
@@ -115,6 +186,8 @@ class At2Service(ServiceBase):
         novxPath = f'{root}{self._mdl.nvService.get_novx_file_extension()}'
         kwargs = self._get_configuration(timelinePath)
         kwargs['nv_service'] = self._mdl.nvService
+        kwargs['timeline_cache'] = self._timelineCache
+        kwargs['sync_map'] = SyncMap(timelinePath)
         source = JsonTimeline2(timelinePath, **kwargs)
         target = self._mdl.nvService.new_novx_file(novxPath)
 
@@ -131,6 +204,7 @@ class At2Service(ServiceBase):
             source.read()
             target.novel = source.novel
             target.write()
+            source.update_sync_map()
         except RuntimeError as ex:
             statusMsg = f'!{str(ex)}'
         else:
@@ -187,6 +261,8 @@ class At2Service(ServiceBase):
 
         kwargs = self._get_configuration(timelinePath)
         kwargs['nv_service'] = self._mdl.nvService
+        kwargs['timeline_cache'] = self._timelineCache
+        kwargs['sync_map'] = SyncMap(timelinePath)
         source = self._mdl.nvService.new_novx_file(
             self._mdl.prjFile.filePath,
             **kwargs
@@ -201,8 +277,18 @@ class At2Service(ServiceBase):
             except NarrativeMissing:
                 pass
             target.write(source.novel)
-            self._ctrl.fileManager.copy_to_backup(target.filePath)
-            message = f'{_("File written")}: "{norm_path(target.filePath)}".'
+            if target.upToDate:
+                message = (
+                    f'{_("File is already up to date")}: '
+                    f'"{norm_path(target.filePath)}".'
+                )
+            else:
+                self._ctrl.fileManager.copy_to_backup(target.filePath)
+                message = (
+                    f'{_("File written")}: '
+                    f'"{norm_path(target.filePath)}" '
+                    f'({_("Changed events")}: {target.touchedEvents}).'
+                )
         except RuntimeError as ex:
             message = f'!{str(ex)}'
         self._ui.set_status(message)
@@ -245,6 +331,8 @@ class At2Service(ServiceBase):
         self._ctrl.save_project()
         kwargs = self._get_configuration(timelinePath)
         kwargs['nv_service'] = self._mdl.nvService
+        kwargs['timeline_cache'] = self._timelineCache
+        kwargs['sync_map'] = SyncMap(timelinePath)
         source = JsonTimeline2(timelinePath, **kwargs)
         target = self._mdl.nvService.new_novx_file(
             self._mdl.prjFile.filePath,
@@ -258,6 +346,7 @@ class At2Service(ServiceBase):
             source.read()
             target.novel = source.novel
             target.write()
+            source.update_sync_map()
             self._ctrl.fileManager.copy_to_backup(target.filePath)
             message = f'{_("File written")}: "{norm_path(target.filePath)}".'
             self._ctrl.open_project(
@@ -292,6 +381,20 @@ class At2Service(ServiceBase):
                 )
             except:
                 tlInfo = _('Cannot determine file date.')
+            kwargs = self._get_configuration(timelinePath)
+            if kwargs['show_event_count']:
+                # Counting means decompressing and scanning the timeline.
+                kwargs['nv_service'] = self._mdl.nvService
+                timeline = JsonTimeline2(timelinePath, **kwargs)
+                try:
+                    eventCount = timeline.count_events()
+                except RuntimeError as ex:
+                    tlInfo = f'{tlInfo}\n{str(ex)}'
+                else:
+                    tlInfo = (
+                        f'{tlInfo}\n'
+                        f'{_("Number of events")}: {eventCount}'
+                    )
         else:
             tlInfo = _('No {} file available for this project.').format(
                 self.windowTitle
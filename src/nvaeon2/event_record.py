@@ -0,0 +1,190 @@
+"""Provide a compact record class for Aeon Timeline 2 events.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import sys
+
+from nvaeon2.range_value_record import RangeValueRecord
+
+
+class EventRecord:
+    """Compact representation of an Aeon Timeline 2 event.
+
+    The record is materialized from the event's JSON object when the
+    timeline is opened, and converted back only when it is saved.
+    - GUIDs are interned.
+    - Range values are RangeValueRecord instances.
+    - Relationships are tuples (role GUID, entity GUID, percentAllocated).
+      They are converted back with the members in alphabetical order,
+      as Aeon Timeline 2 writes them.
+    - Property values are kept as they are.
+    Members unknown to the record are kept, and the JSON member order
+    is restored on conversion.
+    """
+    FIELDS = (
+        'attachments',
+        'color',
+        'displayId',
+        'guid',
+        'links',
+        'locked',
+        'parent',
+        'priority',
+        'rangeValues',
+        'relationships',
+        'tags',
+        'title',
+        'values',
+    )
+    RELATIONSHIP_FIELDS = frozenset((
+        'entity',
+        'percentAllocated',
+        'role',
+    ))
+    __slots__ = FIELDS + (
+        '_keys',
+        '_other',
+    )
+    STANDARD_KEYS = tuple(key for key in FIELDS if key != 'parent')
+    # Members of the events written by Aeon Timeline 2, in their order.
+    _fieldSet = frozenset(FIELDS)
+    _keyOrders = {STANDARD_KEYS: STANDARD_KEYS}
+    # Shared tuples of JSON member names.
+
+    def __init__(self, jsonEvent):
+        """Materialize the record from a JSON event.
+
+        Positional arguments:
+            jsonEvent: dict -- event decoded from timeline.json.
+        """
+        keys = tuple(jsonEvent)
+        self._keys = self._keyOrders.setdefault(keys, keys)
+        self.attachments = jsonEvent.get('attachments', None)
+        self.color = self._intern(jsonEvent.get('color', None))
+        self.displayId = jsonEvent.get('displayId', None)
+        self.guid = jsonEvent.get('guid', None)
+        self.links = jsonEvent.get('links', None)
+        self.locked = jsonEvent.get('locked', None)
+        self.parent = self._intern(jsonEvent.get('parent', None))
+        self.priority = jsonEvent.get('priority', None)
+        self.rangeValues = [
+            RangeValueRecord(jsonRangeValue)
+            for jsonRangeValue in jsonEvent.get('rangeValues', ())
+        ]
+        self.relationships = self._get_relationships(
+            jsonEvent.get('relationships', ())
+        )
+        self.tags = jsonEvent.get('tags', None)
+        self.title = jsonEvent.get('title', None)
+        self.values = jsonEvent.get('values', None)
+        self._other = None
+        if self._keys is self.STANDARD_KEYS:
+            return
+
+        other = {}
+        for key in self._keys:
+            if not key in self._fieldSet:
+                other[key] = jsonEvent[key]
+        self._other = other or None
+
+    def to_json(self):
+        """Return the event as a JSON-serializable dictionary."""
+        if self._keys is self.STANDARD_KEYS:
+            return {
+                'attachments': self.attachments,
+                'color': self.color,
+                'displayId': self.displayId,
+                'guid': self.guid,
+                'links': self.links,
+                'locked': self.locked,
+                'priority': self.priority,
+                'rangeValues': [
+                    rangeValue.to_json() for rangeValue in self.rangeValues
+                ],
+                'relationships': self._get_json_relationships(),
+                'tags': self.tags,
+                'title': self.title,
+                'values': self.values,
+            }
+
+        jsonEvent = {}
+        for key in self._keys:
+            if key == 'rangeValues':
+                jsonEvent[key] = [
+                    rangeValue.to_json() for rangeValue in self.rangeValues
+                ]
+            elif key == 'relationships':
+                jsonEvent[key] = self._get_json_relationships()
+            elif key in self._fieldSet:
+                jsonEvent[key] = getattr(self, key)
+            else:
+                jsonEvent[key] = self._other[key]
+
+        # Add the members set after materializing.
+        for key in ('tags', 'title', 'values'):
+            if not key in jsonEvent and getattr(self, key) is not None:
+                jsonEvent[key] = getattr(self, key)
+        return jsonEvent
+
+    def _get_json_relationships(self):
+        jsonRelationships = [
+            {
+                'entity': relationship[1],
+                'percentAllocated': relationship[2],
+                'role': relationship[0],
+            }
+            for relationship in self.relationships
+        ]
+        for i, relationship in enumerate(self.relationships):
+            if len(relationship) > 3:
+                jsonRelationships[i].update(relationship[3])
+        return jsonRelationships
+
+    def _get_relationship(self, jsonRelationship):
+        relationship = (
+            self._intern(jsonRelationship.get('role', None)),
+            self._intern(jsonRelationship.get('entity', None)),
+            jsonRelationship.get('percentAllocated', None),
+        )
+        if jsonRelationship.keys() == self.RELATIONSHIP_FIELDS:
+            return relationship
+
+        # Keep the members unknown to the record.
+        other = {}
+        for key in jsonRelationship:
+            if not key in self.RELATIONSHIP_FIELDS:
+                other[key] = jsonRelationship[key]
+        return relationship + (other,)
+
+    def _get_relationships(self, jsonRelationships):
+        intern = sys.intern
+        try:
+            if (
+                sum(map(len, jsonRelationships))
+                == len(self.RELATIONSHIP_FIELDS) * len(jsonRelationships)
+            ):
+                # Each relationship has exactly the members of the record.
+                return [
+                    (
+                        intern(jsonRelationship['role']),
+                        intern(jsonRelationship['entity']),
+                        jsonRelationship['percentAllocated'],
+                    )
+                    for jsonRelationship in jsonRelationships
+                ]
+
+        except (KeyError, TypeError):
+            pass
+
+        return [
+            self._get_relationship(jsonRelationship)
+            for jsonRelationship in jsonRelationships
+        ]
+
+    def _intern(self, value):
+        if isinstance(value, str):
+            return sys.intern(value)
+
+        return value
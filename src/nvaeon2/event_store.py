@@ -0,0 +1,159 @@
+"""Provide a columnar store class for Aeon Timeline 2 events.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from calendar import monthrange
+
+
+class EventStore:
+    """Columnar snapshot of the events read from the timeline.
+
+    The events are addressed by their index in the timeline's event list.
+    Timestamps, span seconds, display IDs, titles, and GUIDs are kept
+    in parallel lists. The titles and GUIDs are references to the
+    events' strings, not copies.
+    Sorted indices of the timestamps and display IDs allow ordering
+    the events and finding the maximum values without sorting again.
+    """
+    SECONDS_PER_MONTH = 2629746
+    # average Gregorian month, used for dates out of the datetime range
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.timestamps = []
+        # start timestamp, or None if the event has no date
+        self.spanSeconds = []
+        # duration in seconds, or None if the event has no date
+        self.displayIds = []
+        # display ID as float, or None if not numeric
+        self.titles = []
+        self.guids = []
+        self._chronoOrder = []
+        # indices of all events, sorted by timestamp;
+        # events without date count as timestamp 0
+        self._displayIdOrder = []
+        # indices of the events with numeric display ID, sorted by display ID
+
+    def build(self, events, dateGuid, timestampConverter):
+        """Fill the columns and the sorted indices.
+
+        Positional arguments:
+            events -- list of EventRecord instances.
+            dateGuid: str -- GUID of the template's date range property.
+            timestampConverter -- TimestampConverter instance.
+        """
+        self.timestamps = []
+        self.spanSeconds = []
+        self.displayIds = []
+        self.titles = []
+        self.guids = []
+        for event in events:
+            timestamp = None
+            spanSeconds = None
+            for evtRgv in event.rangeValues:
+                if evtRgv.rangeProperty == dateGuid:
+                    timestamp = evtRgv.timestamp
+                    spanSeconds = self._get_span_seconds(
+                        timestamp,
+                        evtRgv.span or {},
+                        timestampConverter,
+                    )
+                    break
+
+            try:
+                displayId = float(event.displayId)
+            except (TypeError, ValueError):
+                displayId = None
+            self.timestamps.append(timestamp)
+            self.spanSeconds.append(spanSeconds)
+            self.displayIds.append(displayId)
+            self.titles.append(event.title)
+            self.guids.append(event.guid)
+        self._chronoOrder = sorted(
+            range(len(self.timestamps)),
+            key=lambda i: self.timestamps[i] or 0,
+        )
+        self._displayIdOrder = sorted(
+            (i for i, displayId in enumerate(self.displayIds)
+             if displayId is not None),
+            key=self.displayIds.__getitem__,
+        )
+
+    def get_max_display_id(self, indices):
+        """Return the highest numeric display ID of the indexed events.
+
+        Positional arguments:
+            indices -- iterable of event indices.
+
+        Return 0.0, if there is no numeric display ID.
+        """
+        i = self._get_last(self._displayIdOrder, indices)
+        if i is None:
+            return 0.0
+
+        return self.displayIds[i]
+
+    def get_max_timestamp(self, indices):
+        """Return the latest start timestamp of the indexed events.
+
+        Positional arguments:
+            indices -- iterable of event indices.
+
+        Events without date count as timestamp 0.
+        """
+        i = self._get_last(self._chronoOrder, indices)
+        if i is None:
+            return 0
+
+        return self.timestamps[i] or 0
+
+    def sort_chronologically(self, indices):
+        """Return a list of event indices sorted by start timestamp.
+
+        Positional arguments:
+            indices -- iterable of event indices.
+
+        Events without date count as timestamp 0.
+        Events with the same timestamp are in timeline order.
+        """
+        selected = set(indices)
+        return [i for i in self._chronoOrder if i in selected]
+
+    def _get_last(self, order, indices):
+        # Return the last of the indices in the given order, or None.
+        selected = set(indices)
+        for i in reversed(order):
+            if i in selected:
+                return i
+
+        return None
+
+    def _get_span_seconds(self, timestamp, span, timestampConverter):
+        spanSeconds = (
+            (span.get('weeks', 0) * 7 + span.get('days', 0)) * 86400
+            +span.get('hours', 0) * 3600
+            +span.get('minutes', 0) * 60
+            +span.get('seconds', 0)
+        )
+        months = span.get('years', 0) * 12 + span.get('months', 0)
+        if not months:
+            return spanSeconds
+
+        try:
+            startDateTime = timestampConverter.get_datetime(timestamp)
+            month = startDateTime.month - 1 + months
+            year = startDateTime.year + month // 12
+            month = month % 12 + 1
+            endDateTime = startDateTime.replace(
+                year=year,
+                month=month,
+                day=min(startDateTime.day, monthrange(year, month)[1]),
+            )
+        except (OverflowError, ValueError):
+            return spanSeconds + months * self.SECONDS_PER_MONTH
+
+        return spanSeconds + int(
+            (endDateTime - startDateTime).total_seconds()
+        )
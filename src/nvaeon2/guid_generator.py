@@ -4,25 +4,71 @@ Copyright (c) Peter Triesberger
 For further information see https://github.com/peter88213/nv_aeon2
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
+from collections import OrderedDict
+import hashlib
 import uuid
 
 
 class GuidGenerator:
-    """Generator for non-random GUIDs to be used with Aeon Timeline 2."""
+    """Generator for non-random GUIDs to be used with Aeon Timeline 2.
+
+    The GUIDs are the same as generated by uuid.uuid3().
+    The MD5 state for the namespace and the URL is prepared once,
+    and the GUIDs are memoized by fragment.
+    """
+    CACHE_SIZE = 4096
 
     def __init__(self, filePath):
         self._url = f'file:///{filePath}'
+        prefix = uuid.NAMESPACE_URL.bytes + f'{self._url}#'.encode('utf-8')
+        try:
+            self._md5Prefix = hashlib.md5(prefix, usedforsecurity=False)
+            # like uuid.uuid3(); MD5 may be blocked otherwise on FIPS systems
+        except TypeError:
+            # Python versions before 3.9 do not know the argument
+            self._md5Prefix = hashlib.md5(prefix)
+        self._guids = OrderedDict()
+        # key: fragment
+        # value: GUID string
 
     def get_guid(self, fragment):
         """Return a version-3 GUID according to RFC 4122.
-        
+
         Positional arguments:
-            fragment: str -- fragment to be appended to the URL 
+            fragment: str -- fragment to be appended to the URL
                              for individual GUID generation.
         """
-        return str(
-            uuid.uuid3(
-                uuid.NAMESPACE_URL,
-                f'{self._url}#{fragment}'
-            )
+        guid = self._guids.get(fragment, None)
+        if guid is None:
+            guid = self._new_guid(fragment)
+            self._guids[fragment] = guid
+            if len(self._guids) > self.CACHE_SIZE:
+                self._guids.popitem(last=False)
+        else:
+            self._guids.move_to_end(fragment)
+        return guid
+
+    def get_guids(self, fragments):
+        """Return a list of version-3 GUIDs, one for each fragment.
+
+        Positional arguments:
+            fragments -- iterable of fragment strings.
+
+        Unlike get_guid(), this is meant for bulk generation,
+        so the GUIDs are not memoized.
+        """
+        return [self._new_guid(fragment) for fragment in fragments]
+
+    def _new_guid(self, fragment):
+        md5 = self._md5Prefix.copy()
+        md5.update(fragment.encode('utf-8'))
+        digest = bytearray(md5.digest())
+        digest[6] = (digest[6] & 0x0f) | 0x30
+        # version 3
+        digest[8] = (digest[8] & 0x3f) | 0x80
+        # RFC 4122 variant
+        hexDigest = digest.hex()
+        return (
+            f'{hexDigest[:8]}-{hexDigest[8:12]}-{hexDigest[12:16]}-'
+            f'{hexDigest[16:20]}-{hexDigest[20:]}'
         )
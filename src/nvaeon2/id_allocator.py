@@ -0,0 +1,41 @@
+"""Provide a class for allocating new element IDs in bulk.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+
+
+class IdAllocator:
+    """Sequential ID allocator for one collection of novel elements.
+    
+    The allocator is seeded once with the existing IDs. Then it hands out 
+    the same IDs as successive calls of nvlib's new_id() would, 
+    but without rescanning the collection for each new element.
+    
+    Note: All IDs added to the collection while the allocator is in use
+    must be obtained from the allocator.
+    """
+
+    def __init__(self, elements, prefix=''):
+        """Set up the allocator.
+        
+        Positional arguments:
+            elements -- list or dictionary containing all existing IDs.
+            
+        Optional arguments:
+            prefix: str -- ID prefix, e.g. SECTION_PREFIX.
+        """
+        self._prefix = prefix
+        self._usedIds = set(elements)
+        self._nextNumber = 1
+        # All ID numbers below _nextNumber are in use.
+
+    def new_id(self):
+        """Return the lowest unused ID and mark it as used."""
+        while f'{self._prefix}{self._nextNumber}' in self._usedIds:
+            self._nextNumber += 1
+        newId = f'{self._prefix}{self._nextNumber}'
+        self._usedIds.add(newId)
+        self._nextNumber += 1
+        return newId
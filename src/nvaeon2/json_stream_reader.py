@@ -0,0 +1,225 @@
+"""Provide a class for incremental reading of a JSON object from a stream.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import io
+from json import JSONDecodeError
+import json
+import re
+
+
+class JsonStreamReader:
+    """Incremental reader for a JSON object stored in a binary stream.
+
+    The top level object is parsed member by member, and top level
+    arrays of objects are parsed in batches of the elements read
+    completely, if the elements are separated by line breaks.
+    Otherwise, they are parsed element by element.
+    This way, the JSON text never has to be held in memory as a whole,
+    and the decoder shares the key strings within a batch.
+    """
+    CHUNK_SIZE = 1 << 20
+    # characters read at once; doubled while a value is incomplete
+    WHITESPACE = ' \t\n\r'
+    NUMBER_TAIL = re.compile(r'[-+.0-9Ee]*\Z')
+    # a number followed by this might be truncated
+    TRUNCATION_MARGIN = 9
+    # an error this close to the end of the buffer might be due to
+    # truncation, e.g. of "-Infinity" or a "\uXXXX" escape sequence
+
+    def __init__(self, stream, encoding='utf-8'):
+        """Set up the decoder.
+
+        Positional arguments:
+            stream -- binary file object, e.g. returned by ZipFile.open().
+
+        Optional arguments:
+            encoding: str -- encoding of the JSON text.
+        """
+        self._stream = io.TextIOWrapper(stream, encoding=encoding)
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._fillCount = 0
+
+    def items(self):
+        """Generate (key, value) tuples of the top level JSON object.
+
+        Top level arrays are built batch by batch, or element by element.
+        Generate nothing, if the stream is empty.
+        Raise the "JSONDecodeError" exception in case of invalid data,
+        including any data after the top level object.
+        """
+        if not self._skip_whitespace():
+            return
+
+        self._expect('{')
+        if not self._skip_whitespace():
+            self._raise('Expecting property name enclosed in double quotes')
+        if self._buffer[self._pos] == '}':
+            self._pos += 1
+        else:
+            while True:
+                key = self._read_value()
+                if not isinstance(key, str):
+                    self._raise(
+                        'Expecting property name enclosed in double quotes'
+                    )
+
+                self._expect(':')
+                if not self._skip_whitespace():
+                    self._raise('Expecting value')
+                if self._buffer[self._pos] == '[':
+                    self._pos += 1
+                    value = list(self._iter_array())
+                else:
+                    value = self._read_value()
+                yield key, value
+
+                if self._expect(',}') == '}':
+                    break
+
+        if self._skip_whitespace():
+            self._raise('Extra data')
+
+    def _expect(self, characters):
+        # Consume and return the next non-whitespace character,
+        # if it is one of the expected characters.
+        if not self._skip_whitespace():
+            self._raise(f"Expecting '{characters[0]}' delimiter")
+        character = self._buffer[self._pos]
+        if not character in characters:
+            self._raise(f"Expecting '{characters[0]}' delimiter")
+        self._pos += 1
+        return character
+
+    def _fill(self):
+        # Append text to the buffer, discarding the text already consumed.
+        # Read at least as much as is left, so an incomplete value
+        # is decoded a limited number of times.
+        # Return False if the stream is exhausted.
+        if self._eof:
+            return False
+
+        remainder = self._buffer[self._pos:]
+        chunk = self._stream.read(max(self.CHUNK_SIZE, len(remainder)))
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = f'{remainder}{chunk}'
+        self._pos = 0
+        self._fillCount += 1
+        return True
+
+    def _is_truncated(self, error):
+        # Return True if the decoding error may be due to the end of the buffer.
+        return (
+            error.pos >= len(self._buffer) - self.TRUNCATION_MARGIN
+            or error.msg.startswith('Unterminated string')
+        )
+
+    def _iter_array(self):
+        # Generate the elements of an array
+        # whose opening bracket is already consumed.
+        if not self._skip_whitespace():
+            self._raise('Expecting value')
+        if self._buffer[self._pos] == ']':
+            self._pos += 1
+            return
+
+        separator = None
+        # text between two objects, if it contains a line break; '' if not
+        batchFillCount = None
+        # after a failed batch, decode elements one by one until refilled
+        while True:
+            if separator and batchFillCount != self._fillCount:
+                batch = self._read_batch(separator)
+                if batch is None:
+                    batchFillCount = self._fillCount
+                else:
+                    yield from batch
+                    if self._expect(',]') == ']':
+                        return
+
+                    continue
+
+            value = self._read_value()
+            yield value
+            elementEnd = self._pos
+            fillCount = self._fillCount
+            if self._expect(',]') == ']':
+                return
+
+            if (
+                separator is None
+                and isinstance(value, dict)
+                and self._skip_whitespace()
+                and self._fillCount == fillCount
+            ):
+                separator = self._buffer[elementEnd - 1:self._pos + 1]
+                if not (separator.endswith('{') and '\n' in separator):
+                    separator = ''
+
+    def _raise(self, message):
+        raise JSONDecodeError(message, self._buffer, self._pos)
+
+    def _read_batch(self, separator):
+        # Decode the array elements that are completely in the buffer.
+        # Return a list of the elements, or None if none can be decoded.
+        # In indented or line-separated JSON text, the separator
+        # with its line break and indentation is found only
+        # between the array elements. Otherwise, decoding fails.
+        end = self._buffer.rfind(separator, self._pos) + 1
+        if not end:
+            return None
+
+        try:
+            batch = self._decoder.decode(f'[{self._buffer[self._pos:end]}]')
+        except JSONDecodeError:
+            return None
+
+        self._pos = end
+        return batch
+
+    def _read_value(self):
+        # Decode the next JSON value, reading more text if it is incomplete.
+        if not self._skip_whitespace():
+            self._raise('Expecting value')
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError as ex:
+                if self._is_truncated(ex) and self._fill():
+                    continue
+
+                raise
+
+            if (
+                type(value) in (int, float)
+                and self.NUMBER_TAIL.match(self._buffer, end)
+                and self._fill()
+            ):
+                # A number might be truncated at the end of the buffer.
+                continue
+
+            self._pos = end
+            return value
+
+    def _skip_whitespace(self):
+        # Advance to the next non-whitespace character.
+        # Return False if the stream is exhausted.
+        while True:
+            while (
+                self._pos < len(self._buffer)
+                and self._buffer[self._pos] in self.WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return True
+
+            if not self._fill():
+                return False
@@ -7,12 +7,24 @@ License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 
 from datetime import datetime
 from datetime import timedelta
+import gc
+import hashlib
+import zipfile
 
 from nvaeon2.aeon2_fop import open_timeline
+from nvaeon2.aeon2_fop import open_timeline_lazy
 from nvaeon2.aeon2_fop import save_timeline
+from nvaeon2.event_record import EventRecord
+from nvaeon2.event_store import EventStore
 from nvaeon2.guid_generator import GuidGenerator
+from nvaeon2.id_allocator import IdAllocator
+from nvaeon2.moon_phase_engine import MoonPhaseEngine
 from nvaeon2.narrative_missing import NarrativeMissing
 from nvaeon2.nvaeon2_locale import _
+from nvaeon2.overlap_checker import OverlapChecker
+from nvaeon2.relationship_engine import RelationshipEngine
+from nvaeon2.template_index import TemplateIndex
+from nvaeon2.timestamp_converter import TimestampConverter
 from nvlib.model.data.id_generator import new_id
 from nvlib.model.file.file import File
 from nvlib.novx_globals import CHAPTER_PREFIX
@@ -65,11 +77,23 @@ class JsonTimeline2(File):
             color_section: str -- color of new section events.
             color_event: str -- color of new non-section events.
             add_moonphase: bool -- add a moon phase property to each event.
+            compress_timeline: bool -- if False, store the JSON data 
+                                       uncompressed for faster saving.
+            compression_level: str -- compression level (1 to 9); 
+                                      if invalid, the default is used.
+        
+        Optional keyword arguments:
+            timeline_cache -- TimelineCache instance for reusing 
+                              parsed timeline data.
+            sync_map -- SyncMap instance for identifying elements 
+                        renamed since the last sync.
         
         Extends the superclass constructor.
         """
         super().__init__(filePath, **kwargs)
         self._nvSvc = kwargs['nv_service']
+        self._timelineCache = kwargs.get('timeline_cache', None)
+        self._syncMap = kwargs.get('sync_map', None)
 
         # Instantiate a project-specific GUID generator.
 
@@ -81,57 +105,113 @@ class JsonTimeline2(File):
         self._guidGen = GuidGenerator(url)
 
         self._jsonData = None
+        self._events = []
+        # EventRecord instances replacing JSON[events] during conversion
+        self._eventStore = EventStore()
+        # columnar snapshot of the events read
 
         # JSON[entities][name]
         self._entityNarrative = kwargs['narrative_arc']
 
-        # JSON[template][properties][name]
-        self._propertyDesc = kwargs['property_description']
-        self._propertyNotes = kwargs['property_notes']
-        self._propertyMoonphase = kwargs['property_moonphase']
-
-        # JSON[template][types][name][roles]
-        self._roleArc = kwargs['role_arc']
-        self._rolePlotline = kwargs['role_plotline']
-        self._roleCharacter = kwargs['role_character']
-        self._roleLocation = kwargs['role_location']
-        self._roleItem = kwargs['role_item']
-
-        # JSON[template][types][name]
-        self._typeArc = kwargs['type_arc']
-        self._typeCharacter = kwargs['type_character']
-        self._typeLocation = kwargs['type_location']
-        self._typeItem = kwargs['type_item']
-
-        # GUIDs
-        self._tplDateGuid = None
-        self._typeArcGuid = None
-        self._typeCharacterGuid = None
-        self._typeLocationGuid = None
-        self._typeItemGuid = None
-        self._roleArcGuid = None
-        self._rolePlotlineGuid = None
-        self._roleCharacterGuid = None
-        self._roleLocationGuid = None
-        self._roleItemGuid = None
+        # JSON[template] GUIDs
+        self._tpl = TemplateIndex(**kwargs)
+
+        # JSON[entities][guid]
         self._entityNarrativeGuid = None
-        self._propertyDescGuid = None
-        self._propertyNotesGuid = None
-        self._propertyMoonphaseGuid = None
 
         self.referenceDate = None
         self._addMoonphase = kwargs['add_moonphase']
         self._sectionColor = kwargs['color_section']
         self._eventColor = kwargs['color_event']
+        if kwargs['compress_timeline']:
+            self._compression = zipfile.ZIP_DEFLATED
+            try:
+                self._compressLevel = int(kwargs['compression_level'])
+            except ValueError:
+                self._compressLevel = None
+            else:
+                if not 0 <= self._compressLevel <= 9:
+                    # zlib would refuse the level when saving.
+                    self._compressLevel = None
+        else:
+            self._compression = zipfile.ZIP_STORED
+            self._compressLevel = None
         self._timestampMax = 0
         self._displayIdMax = 0.0
-        self._colors = {}
         self._arcCount = 0
         self._characterGuidsById = {}
         self._locationGuidsById = {}
         self._itemGuidsById = {}
         self._arcGuidsById = {}
-        self._trashEvents = []
+        self._sectionGuidsById = {}
+        self._eventFingerprints = {}
+        self._timelineCrc = None
+        self._entitiesByType = {}
+        self._trashEvents = set()
+        self._tsConv = TimestampConverter()
+        self._moonPhases = MoonPhaseEngine(self._nvSvc)
+        self._relations = RelationshipEngine()
+        self.upToDate = False
+        # True, if write() found the timeline file up to date
+        self.touchedEvents = 0
+        # number of events created, changed, or deleted by the last write()
+        self._touchedGuids = set()
+        # GUIDs of the events created, changed, or deleted by write()
+
+    def check_overlaps(self):
+        """Find characters at different locations at the same time.
+
+        This is a read-only analysis of the timeline;
+        the novel is not used, and the file is not written.
+        Events overlapping in time are conflicting, if they share
+        a character, but have no location in common.
+        Return a list of tuples (character name, event title, event title).
+        Raise the "RuntimeError" exception in case of error.
+        """
+        self._open_timeline()
+        self._tpl.read(self._jsonData['template'])
+        self._eventStore.build(self._events, self._tpl.dateGuid, self._tsConv)
+        self._relations.set_roles(self._tpl, self._entityNarrativeGuid)
+        checker = OverlapChecker()
+        for i, event in enumerate(self._events):
+            timestamp = self._eventStore.timestamps[i]
+            if timestamp is None:
+                continue
+
+            characterGuids = self._relations.get_entity_guids(
+                event.relationships,
+                RelationshipEngine.CHARACTER,
+            )
+            if characterGuids:
+                checker.add_event(
+                    i,
+                    timestamp,
+                    timestamp + self._eventStore.spanSeconds[i],
+                    characterGuids,
+                    self._relations.get_entity_guids(
+                        event.relationships,
+                        RelationshipEngine.LOCATION,
+                    ),
+                )
+
+        characterNames = {}
+        for entity in self._jsonData['entities']:
+            if entity['entityType'] == self._tpl.typeCharacterGuid:
+                characterNames[entity['guid']] = entity['name']
+        titles = self._eventStore.titles
+        return [
+            (characterNames.get(guid, guid), titles[i], titles[j])
+            for guid, i, j in checker.get_overlaps()
+        ]
+
+    def count_events(self):
+        """Return the number of events in the timeline.
+
+        This is a read-only operation; only the offset index
+        of the events is built, and no event objects are kept.
+        Raise the "RuntimeError" exception in case of error.
+        """
+        return len(open_timeline_lazy(self.filePath)['events'])
 
     def read(self):
         """Parse the file and get the instance variables.
@@ -145,18 +225,10 @@ class JsonTimeline2(File):
         Overrides the superclass method.
         """
         self._set_reference_date(self.novel)
-        self._jsonData = open_timeline(self.filePath)
+        self._open_timeline()
 
         #--- Fetch JSON template data that may also be needed for writing.
-        self._r_fetch_color_definitions()
-        self._r_fetch_date_definition()
-        self._r_fetch_arc_type_and_roles_guid()
-        self._r_fetch_character_type_and_roles_guid()
-        self._r_fetch_location_type_and_roles_guid()
-        self._r_fetch_item_type_and_roles_guid()
-        self._r_fetch_property_moonphase_guid()
-        self._r_fetch_property_notes_guid()
-        self._r_fetch_property_desc_guid()
+        self._tpl.read(self._jsonData['template'])
 
         # At the beginning, self.novel contains either
         # - the  target data (if syncronizing an existing project), or
@@ -165,28 +237,50 @@ class JsonTimeline2(File):
         # In order to reuse them, they are collected in the
         # "target element ID by title" dictionaries.
 
-        #--- Check the source entities and raise an exception
+        #--- Sort the source entities by type and raise an exception
         #--- if there are ambiguous titles.
-        self._r_check_source_characters()
-        self._r_check_source_locations()
-        self._r_check_source_items()
-        self._r_check_source_arcs()
+        self._r_index_entities()
 
-        #--- Check the target model elements and raise an exception
-        #--- if there are ambiguous titles.
+        #--- Convert all event and character timestamps in one batch.
+        self._r_convert_timestamps()
+
+        #--- Index the events chronologically.
+        self._eventStore.build(self._events, self._tpl.dateGuid, self._tsConv)
+
+        #--- Get the target elements mapped by the last sync.
+        mappedIdsByGuid = {}
+        if self._syncMap is not None:
+            self._syncMap.read()
+            mappedIdsByGuid = self._r_get_mapped_ids()
+        mappedIds = set(mappedIdsByGuid.values())
+
+        #--- Check the target model elements that are not mapped,
+        #--- and raise an exception if there are ambiguous titles.
         #    Get local lookup dictionaries.
-        targetScIdsByTitle = self._r_check_target_sections()
-        targetCrIdsByTitle = self._r_check_target_characters()
-        targetItIdsByTitle = self._r_check_target_items()
-        targetLcIdsByTitle = self._r_check_target_locations()
-        targetAcIdsByTitle = self._r_check_target_arcs()
+        targetScIdsByTitle = self._r_check_target_sections(mappedIds)
+        targetCrIdsByTitle = self._r_check_target_characters(mappedIds)
+        targetItIdsByTitle = self._r_check_target_items(mappedIds)
+        targetLcIdsByTitle = self._r_check_target_locations(mappedIds)
+        targetAcIdsByTitle = self._r_check_target_arcs(mappedIds)
 
         #--- List the JSON entities and create missing target model elements.
         #    Get local lookup dictionaries.
-        crIdsByGuid = self._r_fetch_character_guids_by_id(targetCrIdsByTitle)
-        lcIdsByGuid = self._r_fetch_location_guids_by_id(targetLcIdsByTitle)
-        itIdsByGuid = self._r_fetch_item_guids_by_id(targetItIdsByTitle)
-        acIdsByGuid = self._r_fetch_arc_guids_by_id(targetAcIdsByTitle)
+        crIdsByGuid = self._r_fetch_character_guids_by_id(
+            targetCrIdsByTitle,
+            mappedIdsByGuid,
+        )
+        lcIdsByGuid = self._r_fetch_location_guids_by_id(
+            targetLcIdsByTitle,
+            mappedIdsByGuid,
+        )
+        itIdsByGuid = self._r_fetch_item_guids_by_id(
+            targetItIdsByTitle,
+            mappedIdsByGuid,
+        )
+        acIdsByGuid = self._r_fetch_arc_guids_by_id(
+            targetAcIdsByTitle,
+            mappedIdsByGuid,
+        )
 
         #--- Abort here if there is no "Narrative" arc.
         if not self._entityNarrativeGuid:
@@ -197,8 +291,9 @@ class JsonTimeline2(File):
 
         #--- Build target sections from the source events.
         #    Get local lookup dictionaries.
-        narrativeEvents, scIdsByDate = self._r_update_or_create_sections(
+        narrativeEvents, srtScIds = self._r_update_or_create_sections(
             targetScIdsByTitle,
+            mappedIdsByGuid,
             crIdsByGuid,
             lcIdsByGuid,
             itIdsByGuid,
@@ -207,17 +302,109 @@ class JsonTimeline2(File):
 
         #--- Tidy up the target.
         self._r_make_sections_deleted_in_aeon_unused(narrativeEvents)
-        self._r_put_new_sections_into_new_chapter(scIdsByDate)
+        self._r_put_new_sections_into_new_chapter(srtScIds)
         self._r_adjust_timestamp()
 
+    def update_moon_phases(self):
+        """Add or update the moon phase of each narrative event.
+        
+        This is a fast alternative to read() and write() for 
+        the moon phase data. Only the template and the events 
+        are processed; the novel is not used. 
+        The moon phase is derived from the event's timestamp.
+        Leave the file untouched and set upToDate, 
+        if the JSON data has not changed.
+        Raise the "RuntimeError" exception in case of error. 
+        """
+        self._open_timeline()
+        self._tpl.read(self._jsonData['template'])
+        for entity in self._jsonData['entities']:
+            if (
+                entity['entityType'] == self._tpl.typeArcGuid
+                and entity['name'] == self._entityNarrative
+            ):
+                self._entityNarrativeGuid = entity['guid']
+                break
+
+        else:
+            raise NarrativeMissing(
+                f'{_("The selected project has no narrative arc")} '
+                f'"{self._entityNarrative}".'
+            )
+
+        self._tpl.add_moonphase_property(
+            self._jsonData['template'],
+            self._guidGen,
+        )
+
+        #--- Get the date of each narrative event.
+        self._relations.set_roles(self._tpl, self._entityNarrativeGuid)
+        eventDates = []
+        for event in self._events:
+            if not self._relations.is_narrative(event.relationships):
+                continue
+
+            isoDate = None
+            for evtRgv in event.rangeValues:
+                if evtRgv.rangeProperty == self._tpl.dateGuid:
+                    timestamp = evtRgv.timestamp
+                    if timestamp >= self.DATE_LIMIT:
+                        isoDate = self._tsConv.get_iso_date_time(timestamp)[0]
+            eventDates.append((event, isoDate))
+
+        #--- Set the moon phase values.
+        self._moonPhases.compute_all(isoDate for __, isoDate in eventDates)
+        for event, isoDate in eventDates:
+            eventMoonphase = self._moonPhases.get_moon_phase_str(isoDate)
+            for evtVal in event.values:
+                if evtVal['property'] == self._tpl.propertyMoonphaseGuid:
+                    evtVal['value'] = eventMoonphase
+                    break
+
+            else:
+                event.values.append(
+                    {
+                        'property': self._tpl.propertyMoonphaseGuid,
+                        'value': eventMoonphase
+                    }
+                )
+        self._save_timeline()
+
+    def update_sync_map(self):
+        """Store the GUIDs of the novel elements read from the timeline.
+        
+        Call this after the novel has been saved, 
+        so the element IDs are persistent.
+        """
+        if self._syncMap is None:
+            return
+
+        guidsById = {}
+        for guidsByElementId in (
+            self._sectionGuidsById,
+            self._characterGuidsById,
+            self._locationGuidsById,
+            self._itemGuidsById,
+            self._arcGuidsById,
+        ):
+            guidsById.update(guidsByElementId)
+        self._syncMap.guidsById = guidsById
+        self._syncMap.write()
+
     def write(self, source):
         """Write instance variables to the file.
         
         Update instance variables from a source instance.              
         Update date/time/duration from the source, 
         if the section title matches.
+        Leave the file untouched and set upToDate, 
+        if the JSON data has not changed.
+        Set touchedEvents to the number of events actually created, 
+        changed, or deleted.
         Overrides the superclass method.
         """
+        self.touchedEvents = 0
+        self._touchedGuids.clear()
         self._set_reference_date(source)
 
         #--- Merge first.
@@ -239,127 +426,186 @@ class JsonTimeline2(File):
         self._w_check_source_arcs(source, relatedArcs)
 
         srcScnTitles = self._w_check_source_sections(source)
-        self._w_collect_trashed_sections(srcScnTitles)
 
-        #--- Check the target for ambiguous titles.
+        #--- Get the target elements mapped by the last sync.
+        mappedIds = {}
+        # key: source element ID
+        # value: target element ID
+        if self._syncMap is not None:
+            mappedIds = self._w_get_mapped_ids(source)
+        targetIds = set(mappedIds.values())
+
+        #--- Check the target elements that are not mapped
+        #--- for ambiguous titles.
         #    Get local lookup dictionaries.
-        scIdsByTitle = self._w_check_target_sections()
-        crIdsByTitle = self._w_check_target_characters()
-        lcIdsByTitle = self._w_check_target_locations()
-        itIdsByTitle = self._w_check_target_items()
-        acIdsByTitle = self._w_check_target_arcs()
+        scIdsByTitle = self._w_check_target_sections(targetIds)
+        crIdsByTitle = self._w_check_target_characters(targetIds)
+        lcIdsByTitle = self._w_check_target_locations(targetIds)
+        itIdsByTitle = self._w_check_target_items(targetIds)
+        acIdsByTitle = self._w_check_target_arcs(targetIds)
+
+        #--- Apply the renamings identified by the sync map.
+        if mappedIds:
+            self._w_rename_mapped_elements(
+                source,
+                mappedIds,
+                scIdsByTitle,
+                crIdsByTitle,
+                lcIdsByTitle,
+                itIdsByTitle,
+                acIdsByTitle,
+            )
+        self._w_collect_trashed_sections(srcScnTitles)
 
         #--- Complete the JSON template if needed.
-        self._w_create_json_type_character_if_missing()
-        self._w_create_json_type_location_if_missing()
-        self._w_create_json_type_item_if_missing()
-        self._w_create_json_type_arc_if_missing()
-        self._w_create_json_role_arc_if_missing()
-        self._w_create_json_role_character_if_missing()
-        self._w_create_json_role_location_if_missing()
-        self._w_create_json_role_item_if_missing()
-        self._w_create_json_role_plotline_if_missing()
-        self._w_create_json_property_notes_if_missing()
-        self._w_create_json_property_desc_if_missing()
-        self._w_create_json_property_moonphase_if_missing()
+        self._tpl.complete(
+            self._jsonData['template'],
+            self._guidGen,
+            self._addMoonphase,
+        )
+
+        #--- Get the sections unchanged since the last sync.
+        unchangedIds = set()
+        if mappedIds:
+            unchangedIds = self._w_get_unchanged_sections(source, mappedIds)
 
         #--- Update JSON data from the source.
         #    Get local lookup dictionaries.
         crIdsBySrcId = self._w_update_characters_from_source(
             source,
+            mappedIds,
             crIdsByTitle,
             relatedCharacters,
         )
         lcIdsBySrcId = self._w_update_locations_from_source(
             source,
+            mappedIds,
             lcIdsByTitle,
             relatedLocations,
         )
         itIdsBySrcId = self._w_update_items_from_source(
             source,
+            mappedIds,
             itIdsByTitle,
             relatedItems,
         )
         acIdsBySrcId = self._w_update_arcs_from_source(
             source,
+            mappedIds,
             acIdsByTitle,
             relatedArcs,
         )
-        self._w_update_sections_from_source(
+        scIdsBySrcId = self._w_update_sections_from_source(
             source,
+            mappedIds,
             scIdsByTitle,
             crIdsBySrcId,
             lcIdsBySrcId,
             itIdsBySrcId,
             acIdsBySrcId,
+            unchangedIds,
         )
 
         #--- Begin writing
 
         #--- Update the target JSON timeline elements.
         self._w_create_json_narrative_arc_if_missing()
-        self._w_update_json_events_from_sections(scIdsByTitle)
-        self._w_delete_trashed_events(scIdsByTitle)
-
-        save_timeline(self._jsonData, self.filePath)
-
-    def _r_adjust_timestamp(self):
-        if self._timestampMax == 0:
-            self._timestampMax = (
-                (self.referenceDate - datetime.min).total_seconds()
+        scIdsByGuid = {}
+        unchangedGuids = set()
+        for srcId in source.sections:
+            if srcId in mappedIds:
+                scId = mappedIds[srcId]
+                if srcId in unchangedIds:
+                    unchangedGuids.add(self._sectionGuidsById[scId])
+                else:
+                    scIdsByGuid[self._sectionGuidsById[scId]] = scId
+        self._w_update_json_events_from_sections(
+            scIdsByTitle,
+            scIdsByGuid,
+            unchangedGuids,
+        )
+        self._w_delete_trashed_events()
+        self.touchedEvents = len(self._touchedGuids)
+        self._save_timeline()
+
+        #--- Remember the GUIDs of the source elements.
+        if self._syncMap is not None:
+            self._w_update_sync_map(
+                source,
+                scIdsBySrcId,
+                crIdsBySrcId,
+                lcIdsBySrcId,
+                itIdsBySrcId,
+                acIdsBySrcId,
             )
 
-    def _r_check_source_arcs(self):
-        arcNames = []
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] == self._typeArcGuid:
-                if entity['name'] in arcNames:
-                    raise RuntimeError(
-                        _('Ambiguous Aeon arc "{}".').format(
-                            entity['name'])
-                    )
+    def _get_timeline_crc(self):
+        try:
+            with zipfile.ZipFile(self.filePath, 'r') as myzip:
+                return myzip.getinfo('timeline.json').CRC
 
-                arcNames.append(entity['name'])
+        except:
+            return None
 
-    def _r_check_source_characters(self):
-        characterNames = []
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] == self._typeCharacterGuid:
-                if entity['name'] in characterNames:
-                    raise RuntimeError(
-                        _('Ambiguous Aeon character "{}".').format(
-                            entity['name'])
-                    )
+    def _match_mapped_element(self, elements, elemId, title, idsByTitle):
+        """Give a mapped element the title of its counterpart.
+        
+        Positional arguments:
+            elements -- dictionary of novel elements by ID.
+            elemId: str -- ID of the element mapped by the last sync.
+            title: str -- title of the mapped counterpart.
+            idsByTitle -- dictionary of the unmapped element IDs by title.
+        
+        Return the ID of the matching element. 
+        If the title is already taken by an unmapped element,
+        the mapped element is not renamed, and the element 
+        with that title matches, as without sync map.
+        """
+        if title == elements[elemId].title:
+            return elemId
 
-                characterNames.append(entity['name'])
+        if title in idsByTitle:
+            return idsByTitle[title]
 
-    def _r_check_source_items(self):
-        itemNames = []
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] == self._typeItemGuid:
-                if entity['name'] in itemNames:
-                    raise RuntimeError(
-                        _('Ambiguous Aeon item "{}".').format(
-                            entity['name'])
-                    )
+        if title:
+            elements[elemId].title = title
+        return elemId
 
-                itemNames.append(entity['name'])
+    def _open_timeline(self):
+        if self._timelineCache is None:
+            self._jsonData = open_timeline(self.filePath)
+        else:
+            self._jsonData = self._timelineCache.open_timeline(self.filePath)
+
+        #--- Replace the JSON events with compact records.
+        self._events = self._jsonData['events']
+        self._jsonData['events'] = None
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        # The records have no reference cycles, so the
+        # garbage collector's passes would only slow down here.
+        try:
+            for i, jsonEvent in enumerate(self._events):
+                self._events[i] = EventRecord(jsonEvent)
+        finally:
+            if gcEnabled:
+                gc.enable()
 
-    def _r_check_source_locations(self):
-        locationNames = []
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] == self._typeLocationGuid:
-                if entity['name'] in locationNames:
-                    raise RuntimeError(
-                        _('Ambiguous Aeon location "{}".').format(
-                            entity['name'])
-                    )
+        if self._syncMap is not None:
+            self._timelineCrc = self._get_timeline_crc()
 
-                locationNames.append(entity['name'])
+    def _r_adjust_timestamp(self):
+        if self._timestampMax == 0:
+            self._timestampMax = (
+                (self.referenceDate - datetime.min).total_seconds()
+            )
 
-    def _r_check_target_arcs(self):
+    def _r_check_target_arcs(self, mappedIds):
         targetAcIdsByTitle = {}
         for acId in self.novel.plotLines:
+            if acId in mappedIds:
+                continue
+
             title = self.novel.plotLines[acId].title
             if title:
                 if title in targetAcIdsByTitle:
@@ -371,9 +617,12 @@ class JsonTimeline2(File):
                 targetAcIdsByTitle[title] = acId
         return targetAcIdsByTitle
 
-    def _r_check_target_characters(self):
+    def _r_check_target_characters(self, mappedIds):
         targetCrIdsByTitle = {}
         for crId in self.novel.characters:
+            if crId in mappedIds:
+                continue
+
             title = self.novel.characters[crId].title
             if title:
                 if title in targetCrIdsByTitle:
@@ -385,9 +634,12 @@ class JsonTimeline2(File):
                 targetCrIdsByTitle[title] = crId
         return targetCrIdsByTitle
 
-    def _r_check_target_items(self):
+    def _r_check_target_items(self, mappedIds):
         targetItIdsByTitle = {}
         for itId in self.novel.items:
+            if itId in mappedIds:
+                continue
+
             title = self.novel.items[itId].title
             if title:
                 if title in targetItIdsByTitle:
@@ -399,9 +651,12 @@ class JsonTimeline2(File):
                 targetItIdsByTitle[title] = itId
         return targetItIdsByTitle
 
-    def _r_check_target_locations(self):
+    def _r_check_target_locations(self, mappedIds):
         targetLcIdsByTitle = {}
         for lcId in self.novel.locations:
+            if lcId in mappedIds:
+                continue
+
             title = self.novel.locations[lcId].title
             if title:
                 if title in targetLcIdsByTitle:
@@ -413,9 +668,12 @@ class JsonTimeline2(File):
                 targetLcIdsByTitle[title] = lcId
         return targetLcIdsByTitle
 
-    def _r_check_target_sections(self):
+    def _r_check_target_sections(self, mappedIds):
         targetScIdsByTitle = {}
         for scId in self.novel.sections:
+            if scId in mappedIds:
+                continue
+
             title = self.novel.sections[scId].title
             if title:
                 if title in targetScIdsByTitle:
@@ -427,54 +685,77 @@ class JsonTimeline2(File):
                 targetScIdsByTitle[title] = scId
         return targetScIdsByTitle
 
-    def _r_fetch_arc_guids_by_id(self, targetAcIdsByTitle):
+    def _r_convert_timestamps(self):
+        timestamps = []
+        for event in self._events:
+            for evtRgv in event.rangeValues:
+                if evtRgv.rangeProperty == self._tpl.dateGuid:
+                    timestamps.append(evtRgv.timestamp)
+        for entity in self._entitiesByType.get(
+            self._tpl.typeCharacterGuid, []
+        ):
+            for rangePosition in (
+                entity.get('createRangePosition', None),
+                entity.get('destroyRangePosition', None),
+            ):
+                if rangePosition:
+                    timestamps.append(rangePosition['timestamp'])
+        self._tsConv.convert_all(timestamps)
+
+    def _r_fetch_arc_guids_by_id(self, targetAcIdsByTitle, mappedIdsByGuid):
         acIdsByGuid = {}
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] != self._typeArcGuid:
+        plIdAlloc = IdAllocator(self.novel.plotLines, prefix=PLOT_LINE_PREFIX)
+        for entity in self._entitiesByType.get(self._tpl.typeArcGuid, []):
+            if entity['name'] == self._entityNarrative:
+                self._entityNarrativeGuid = entity['guid']
                 continue
 
             # Check whether there is already a plot line for the entity.
-            if entity['name'] in targetAcIdsByTitle:
+            plId = mappedIdsByGuid.get(entity['guid'], None)
+            if plId is not None:
+                plId = self._match_mapped_element(
+                    self.novel.plotLines,
+                    plId,
+                    entity['name'],
+                    targetAcIdsByTitle,
+                )
+            elif entity['name'] in targetAcIdsByTitle:
                 plId = targetAcIdsByTitle[entity['name']]
-            elif entity['name'] != self._entityNarrative:
-
-                # Create a new plot line, if it's not the "Narrative" indicator.
-                plId = new_id(self.novel.plotLines, prefix=PLOT_LINE_PREFIX)
+            else:
+                # Create a new plot line.
+                plId = plIdAlloc.new_id()
                 self.novel.plotLines[plId] = self._nvSvc.new_plot_line(
                     title=entity['name'],
                     shortName=entity['name']
                 )
                 self.novel.tree.append(PL_ROOT, plId)
-            if entity['name'] == self._entityNarrative:
-                self._entityNarrativeGuid = entity['guid']
-            else:
-                acIdsByGuid[entity['guid']] = plId
-                self._arcGuidsById[plId] = entity['guid']
-                self._arcCount += 1
+            acIdsByGuid[entity['guid']] = plId
+            self._arcGuidsById[plId] = entity['guid']
+            self._arcCount += 1
         return acIdsByGuid
 
-    def _r_fetch_arc_type_and_roles_guid(self):
-        for tplTyp in self._jsonData['template']['types']:
-            if tplTyp['name'] == self._typeArc:
-                self._typeArcGuid = tplTyp['guid']
-                for tplTypRol in tplTyp['roles']:
-                    if tplTypRol['name'] == self._roleArc:
-                        self._roleArcGuid = tplTypRol['guid']
-                    elif tplTypRol['name'] == self._rolePlotline:
-                        self._rolePlotlineGuid = tplTypRol['guid']
-
-    def _r_fetch_character_guids_by_id(self, targetCrIdsByTitle):
+    def _r_fetch_character_guids_by_id(
+            self,
+            targetCrIdsByTitle,
+            mappedIdsByGuid
+    ):
         crIdsByGuid = {}
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] != self._typeCharacterGuid:
-                continue
-
+        crIdAlloc = IdAllocator(self.novel.characters, prefix=CHARACTER_PREFIX)
+        for entity in self._entitiesByType.get(self._tpl.typeCharacterGuid, []):
             # Check whether there is already a character for the entity.
-            if entity['name'] in targetCrIdsByTitle:
+            crId = mappedIdsByGuid.get(entity['guid'], None)
+            if crId is not None:
+                crId = self._match_mapped_element(
+                    self.novel.characters,
+                    crId,
+                    entity['name'],
+                    targetCrIdsByTitle,
+                )
+            elif entity['name'] in targetCrIdsByTitle:
                 crId = targetCrIdsByTitle[entity['name']]
             else:
                 # Create a new character.
-                crId = new_id(self.novel.characters, prefix=CHARACTER_PREFIX)
+                crId = crIdAlloc.new_id()
                 self.novel.characters[crId] = self._nvSvc.new_character(
                     title=entity['name']
                 )
@@ -491,9 +772,8 @@ class JsonTimeline2(File):
                 if timestamp >= self.DATE_LIMIT:
                     # Restrict date/time calculation to dates
                     # within novelibre's range
-                    birthDate = datetime.min + timedelta(seconds=timestamp)
                     self.novel.characters[crId].birthDate = (
-                        birthDate.isoformat().split('T')[0]
+                        self._tsConv.get_iso_date_time(timestamp)[0]
                     )
             destroyRangePosition = entity.get('destroyRangePosition', None)
             if destroyRangePosition:
@@ -501,47 +781,28 @@ class JsonTimeline2(File):
                 if timestamp >= self.DATE_LIMIT:
                     # Restrict date/time calculation to dates
                     # within novelibre's range
-                    deathDate = datetime.min + timedelta(seconds=timestamp)
                     self.novel.characters[crId].deathDate = (
-                        deathDate.isoformat().split('T')[0]
+                        self._tsConv.get_iso_date_time(timestamp)[0]
                     )
         return crIdsByGuid
 
-    def _r_fetch_character_type_and_roles_guid(self):
-        for tplTyp in self._jsonData['template']['types']:
-            if tplTyp['name'] == self._typeCharacter:
-                self._typeCharacterGuid = tplTyp['guid']
-                for tplTypRol in tplTyp['roles']:
-                    if tplTypRol['name'] == self._roleCharacter:
-                        self._roleCharacterGuid = tplTypRol['guid']
-                        break
-
-    def _r_fetch_color_definitions(self):
-        for tplCol in self._jsonData['template']['colors']:
-            self._colors[tplCol['name']] = tplCol['guid']
-
-    def _r_fetch_date_definition(self):
-        for tplRgp in self._jsonData['template']['rangeProperties']:
-            if tplRgp['type'] == 'date':
-                for tplRgpCalEra in tplRgp['calendar']['eras']:
-                    if tplRgpCalEra['name'] == 'AD':
-                        self._tplDateGuid = tplRgp['guid']
-                        break
-
-        if self._tplDateGuid is None:
-            raise RuntimeError(_('"AD" era is missing in the calendar.'))
-
-    def _r_fetch_item_guids_by_id(self, targetItIdsByTitle):
+    def _r_fetch_item_guids_by_id(self, targetItIdsByTitle, mappedIdsByGuid):
         itIdsByGuid = {}
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] != self._typeItemGuid:
-                continue
-
+        itIdAlloc = IdAllocator(self.novel.items, prefix=ITEM_PREFIX)
+        for entity in self._entitiesByType.get(self._tpl.typeItemGuid, []):
             # Check whether there is already an item for the entity.
-            if entity['name'] in targetItIdsByTitle:
+            itId = mappedIdsByGuid.get(entity['guid'], None)
+            if itId is not None:
+                itId = self._match_mapped_element(
+                    self.novel.items,
+                    itId,
+                    entity['name'],
+                    targetItIdsByTitle,
+                )
+            elif entity['name'] in targetItIdsByTitle:
                 itId = targetItIdsByTitle[entity['name']]
             else:
-                itId = new_id(self.novel.items, prefix=ITEM_PREFIX)
+                itId = itIdAlloc.new_id()
                 self.novel.items[itId] = self._nvSvc.new_world_element()
                 self.novel.items[itId].title = entity['name']
                 self.novel.tree.append(IT_ROOT, itId)  # Create a new item.
@@ -549,26 +810,27 @@ class JsonTimeline2(File):
             self._itemGuidsById[itId] = entity['guid']
         return itIdsByGuid
 
-    def _r_fetch_item_type_and_roles_guid(self):
-        for tplTyp in self._jsonData['template']['types']:
-            if tplTyp['name'] == self._typeItem:
-                self._typeItemGuid = tplTyp['guid']
-                for tplTypRol in tplTyp['roles']:
-                    if tplTypRol['name'] == self._roleItem:
-                        self._roleItemGuid = tplTypRol['guid']
-                        break
-
-    def _r_fetch_location_guids_by_id(self, targetLcIdsByTitle):
+    def _r_fetch_location_guids_by_id(
+            self,
+            targetLcIdsByTitle,
+            mappedIdsByGuid
+    ):
         lcIdsByGuid = {}
-        for entity in self._jsonData['entities']:
-            if entity['entityType'] != self._typeLocationGuid:
-                continue
-
+        lcIdAlloc = IdAllocator(self.novel.locations, prefix=LOCATION_PREFIX)
+        for entity in self._entitiesByType.get(self._tpl.typeLocationGuid, []):
             # Check whether there is already a location for the entity.
-            if entity['name'] in targetLcIdsByTitle:
+            lcId = mappedIdsByGuid.get(entity['guid'], None)
+            if lcId is not None:
+                lcId = self._match_mapped_element(
+                    self.novel.locations,
+                    lcId,
+                    entity['name'],
+                    targetLcIdsByTitle,
+                )
+            elif entity['name'] in targetLcIdsByTitle:
                 lcId = targetLcIdsByTitle[entity['name']]
             else:
-                lcId = new_id(self.novel.locations, prefix=LOCATION_PREFIX)
+                lcId = lcIdAlloc.new_id()
                 self.novel.locations[lcId] = self._nvSvc.new_world_element()
                 self.novel.locations[lcId].title = entity['name']
                 self.novel.tree.append(LC_ROOT, lcId)  # Create a new location.
@@ -576,32 +838,59 @@ class JsonTimeline2(File):
             self._locationGuidsById[lcId] = entity['guid']
         return lcIdsByGuid
 
-    def _r_fetch_location_type_and_roles_guid(self):
-        for tplTyp in self._jsonData['template']['types']:
-            if tplTyp['name'] == self._typeLocation:
-                self._typeLocationGuid = tplTyp['guid']
-                for tplTypRol in tplTyp['roles']:
-                    if tplTypRol['name'] == self._roleLocation:
-                        self._roleLocationGuid = tplTypRol['guid']
-                        break
-
-    def _r_fetch_property_desc_guid(self):
-        for tplPrp in self._jsonData['template']['properties']:
-            if tplPrp['name'] == self._propertyDesc:
-                self._propertyDescGuid = tplPrp['guid']
-                return
-
-    def _r_fetch_property_moonphase_guid(self):
-        for tplPrp in self._jsonData['template']['properties']:
-            if tplPrp['name'] == self._propertyMoonphase:
-                self._propertyMoonphaseGuid = tplPrp['guid']
-                return
-
-    def _r_fetch_property_notes_guid(self):
-        for tplPrp in self._jsonData['template']['properties']:
-            if tplPrp['name'] == self._propertyNotes:
-                self._propertyNotesGuid = tplPrp['guid']
-                return
+    def _r_get_mapped_ids(self):
+        """Return a dictionary with the target element IDs by GUID.
+        
+        Only the target elements that the last sync has mapped 
+        to an event or entity of the timeline are listed.
+        """
+        idsByGuid = self._syncMap.get_ids_by_guid()
+        mappedIdsByGuid = {}
+        for guid in self._eventStore.guids:
+            scId = idsByGuid.get(guid, None)
+            if scId in self.novel.sections:
+                mappedIdsByGuid[guid] = scId
+        for elements, typeGuid in (
+            (self.novel.characters, self._tpl.typeCharacterGuid),
+            (self.novel.locations, self._tpl.typeLocationGuid),
+            (self.novel.items, self._tpl.typeItemGuid),
+            (self.novel.plotLines, self._tpl.typeArcGuid),
+        ):
+            for entity in self._entitiesByType.get(typeGuid, []):
+                elemId = idsByGuid.get(entity['guid'], None)
+                if elemId in elements:
+                    mappedIdsByGuid[entity['guid']] = elemId
+        return mappedIdsByGuid
+
+    def _r_index_entities(self):
+        """Sort the JSON entities by type in one single pass.
+        
+        Raise the "RuntimeError" exception if there are ambiguous
+        character, location, item, or arc names.
+        """
+        self._entitiesByType = {}
+        namesByType = {}
+        ambiguousNames = {}
+        for entity in self._jsonData['entities']:
+            entityType = entity['entityType']
+            if not entityType in self._entitiesByType:
+                self._entitiesByType[entityType] = []
+                namesByType[entityType] = set()
+            self._entitiesByType[entityType].append(entity)
+            if entity['name'] in namesByType[entityType]:
+                if not entityType in ambiguousNames:
+                    ambiguousNames[entityType] = entity['name']
+            else:
+                namesByType[entityType].add(entity['name'])
+
+        for entityType, message in (
+            (self._tpl.typeCharacterGuid, _('Ambiguous Aeon character "{}".')),
+            (self._tpl.typeLocationGuid, _('Ambiguous Aeon location "{}".')),
+            (self._tpl.typeItemGuid, _('Ambiguous Aeon item "{}".')),
+            (self._tpl.typeArcGuid, _('Ambiguous Aeon arc "{}".')),
+        ):
+            if entityType in ambiguousNames:
+                raise RuntimeError(message.format(ambiguousNames[entityType]))
 
     def _r_make_sections_deleted_in_aeon_unused(self, narrativeEvents):
         for scId in self.novel.sections:
@@ -609,64 +898,76 @@ class JsonTimeline2(File):
                 if self.novel.sections[scId].scType == 0:
                     self.novel.sections[scId].scType = 1
 
-    def _r_put_new_sections_into_new_chapter(self, scIdsByDate):
-        sectionsInChapters = []
-        # List all sections already assigned to a chapter.
+    def _r_put_new_sections_into_new_chapter(self, srtScIds):
+        sectionsInChapters = set()
+        # Collect all sections already assigned to a chapter.
         for chId in self.novel.tree.get_children(CH_ROOT):
-            sectionsInChapters.extend(self.novel.tree.get_children(chId))
+            sectionsInChapters.update(self.novel.tree.get_children(chId))
 
         # Create a chapter for new sections.
         newChapterId = new_id(self.novel.chapters, prefix=CHAPTER_PREFIX)
         newChapter = self._nvSvc.new_chapter(title=_('New sections'), chType=0)
-        # Sort sections by date/time, then put the orphaned ones
-        # into the new chapter.
-        srtSections = sorted(scIdsByDate.items())
-        for __, scList in srtSections:
-            for scId in scList:
-                if not scId in sectionsInChapters:
-                    if not newChapterId in self.novel.tree.get_children(
-                        CH_ROOT
-                    ):
-                        self.novel.chapters[newChapterId] = newChapter
-                        self.novel.tree.append(CH_ROOT, newChapterId)
-                    self.novel.tree.append(newChapterId, scId)
+        hasNewChapter = False
+        # Put the orphaned sections into the new chapter,
+        # sorted by date/time.
+        for scId in srtScIds:
+            if not scId in sectionsInChapters:
+                if not hasNewChapter:
+                    self.novel.chapters[newChapterId] = newChapter
+                    self.novel.tree.append(CH_ROOT, newChapterId)
+                    hasNewChapter = True
+                self.novel.tree.append(newChapterId, scId)
 
     def _r_update_or_create_sections(
             self,
             targetScIdsByTitle,
+            mappedIdsByGuid,
             crIdsByGuid,
             lcIdsByGuid,
             itIdsByGuid,
             acIdsByGuid
     ):
-        scIdsByDate = {}
-        scnTitles = []
-        narrativeEvents = []
-        for event in self._jsonData['events']:
-
-            # Find out whether the event is associated to a section:
-            isNarrative = False
-            for evtRel in event['relationships']:
-                if evtRel['role'] == self._roleArcGuid:
-                    if evtRel['entity'] == self._entityNarrativeGuid:
-                        isNarrative = True
-                        break
+        scIdsByEvent = {}
+        # key: event index
+        # value: section ID
+        narrativeIndices = []
+        scnTitles = set()
+        narrativeEvents = set()
+        scIdAlloc = IdAllocator(self.novel.sections, prefix=SECTION_PREFIX)
+        self._relations.set_roles(self._tpl, self._entityNarrativeGuid)
+        for i, event in enumerate(self._events):
+
+            # Find out whether the event is associated to a section,
+            # and sort the relationships by role.
+            (
+                isNarrative,
+                entityGuids,
+                __,
+            ) = self._relations.classify(event.relationships)
 
             # Check whether the section title is unique.
-            eventTitle = event['title'].strip()
+            eventTitle = event.title.strip()
             if eventTitle in scnTitles:
                 raise RuntimeError(
                     _('Ambiguous Aeon event title "{}".').format(eventTitle)
                 )
 
-            scnTitles.append(eventTitle)
+            scnTitles.add(eventTitle)
 
             # Check whether there is already a section for the event.
-            if eventTitle in targetScIdsByTitle:
+            scId = mappedIdsByGuid.get(event.guid, None)
+            if scId is not None:
+                scId = self._match_mapped_element(
+                    self.novel.sections,
+                    scId,
+                    eventTitle,
+                    targetScIdsByTitle,
+                )
+            elif eventTitle in targetScIdsByTitle:
                 scId = targetScIdsByTitle[eventTitle]
             elif isNarrative:
                 # Create a new section.
-                scId = new_id(self.novel.sections, prefix=SECTION_PREFIX)
+                scId = scIdAlloc.new_id()
                 self.novel.sections[scId] = self._nvSvc.new_section(
                     title=eventTitle,
                     status=1,
@@ -676,58 +977,57 @@ class JsonTimeline2(File):
             else:
                 continue
 
-            narrativeEvents.append(scId)
-            displayId = float(event['displayId'])
-            if displayId > self._displayIdMax:
-                self._displayIdMax = displayId
+            self._sectionGuidsById[scId] = event.guid
+            narrativeEvents.add(scId)
+            scIdsByEvent[i] = scId
 
             #--- Evaluate properties.
             hasDescription = False
             hasNotes = False
-            for evtVal in event['values']:
+            for evtVal in event.values:
 
                 # Get section description.
-                if evtVal['property'] == self._propertyDescGuid:
+                if evtVal['property'] == self._tpl.propertyDescGuid:
                     hasDescription = True
                     if evtVal['value']:
                         self.novel.sections[scId].desc = evtVal['value']
 
                 # Get section notes.
-                elif evtVal['property'] == self._propertyNotesGuid:
+                elif evtVal['property'] == self._tpl.propertyNotesGuid:
                     hasNotes = True
                     if evtVal['value']:
                         self.novel.sections[scId].notes = evtVal['value']
 
             #--- Add description and section notes, if missing.
             if not hasDescription:
-                event['values'].append({
-                    'property': self._propertyDescGuid,
+                event.values.append({
+                    'property': self._tpl.propertyDescGuid,
                     'value': ''
                 })
             if not hasNotes:
-                event['values'].append({
-                    'property': self._propertyNotesGuid,
+                event.values.append({
+                    'property': self._tpl.propertyNotesGuid,
                     'value': ''
                 })
 
             #--- Get section tags.
-            if event['tags']:
+            if event.tags:
                 self.novel.sections[scId].tags = []
-                for evtTag in event['tags']:
+                for evtTag in event.tags:
                     self.novel.sections[scId].tags.append(evtTag)
 
             #--- Get date/time/duration
             timestamp = 0
-            for evtRgv in event['rangeValues']:
-                if evtRgv['rangeProperty'] == self._tplDateGuid:
-                    timestamp = evtRgv['position']['timestamp']
+            for evtRgv in event.rangeValues:
+                if evtRgv.rangeProperty == self._tpl.dateGuid:
+                    timestamp = evtRgv.timestamp
                     if timestamp >= self.DATE_LIMIT:
                         # Restrict date/time calculation to dates
                         # within novelibre's range
-                        sectionStart = (
-                            datetime.min + timedelta(seconds=timestamp)
+                        sectionStart = self._tsConv.get_datetime(timestamp)
+                        startDateTime = self._tsConv.get_iso_date_time(
+                            timestamp
                         )
-                        startDateTime = sectionStart.isoformat().split('T')
 
                         # Has the source an unspecific date?
                         if self.novel.sections[scId].day is not None:
@@ -748,15 +1048,15 @@ class JsonTimeline2(File):
 
                         # Calculate duration
                         if (
-                            'years' in evtRgv['span']
-                            or 'months' in evtRgv['span']
+                            'years' in evtRgv.span
+                            or 'months' in evtRgv.span
                         ):
                             endYear = sectionStart.year
                             endMonth = sectionStart.month
-                            if 'years' in evtRgv['span']:
-                                endYear += evtRgv['span']['years']
-                            if 'months' in evtRgv['span']:
-                                endMonth += evtRgv['span']['months']
+                            if 'years' in evtRgv.span:
+                                endYear += evtRgv.span['years']
+                            if 'months' in evtRgv.span:
+                                endMonth += evtRgv.span['months']
                                 while endMonth > 12:
                                     endMonth -= 12
                                     endYear += 1
@@ -779,18 +1079,18 @@ class JsonTimeline2(File):
                             lastsDays = 0
                             lastsHours = 0
                             lastsMinutes = 0
-                        if 'weeks' in evtRgv['span']:
-                            lastsDays += evtRgv['span']['weeks'] * 7
-                        if 'days' in evtRgv['span']:
-                            lastsDays += evtRgv['span']['days']
-                        if 'hours' in evtRgv['span']:
-                            lastsDays += evtRgv['span']['hours'] // 24
-                            lastsHours += evtRgv['span']['hours'] % 24
-                        if 'minutes' in evtRgv['span']:
-                            lastsHours += evtRgv['span']['minutes'] // 60
-                            lastsMinutes += evtRgv['span']['minutes'] % 60
-                        if 'seconds' in evtRgv['span']:
-                            lastsMinutes += evtRgv['span']['seconds'] // 60
+                        if 'weeks' in evtRgv.span:
+                            lastsDays += evtRgv.span['weeks'] * 7
+                        if 'days' in evtRgv.span:
+                            lastsDays += evtRgv.span['days']
+                        if 'hours' in evtRgv.span:
+                            lastsDays += evtRgv.span['hours'] // 24
+                            lastsHours += evtRgv.span['hours'] % 24
+                        if 'minutes' in evtRgv.span:
+                            lastsHours += evtRgv.span['minutes'] // 60
+                            lastsMinutes += evtRgv.span['minutes'] % 60
+                        if 'seconds' in evtRgv.span:
+                            lastsMinutes += evtRgv.span['seconds'] // 60
                         lastsHours += lastsMinutes // 60
                         lastsMinutes %= 60
                         lastsDays += lastsHours // 24
@@ -806,58 +1106,45 @@ class JsonTimeline2(File):
                         )
                     break
 
-            # Use the timestamp for chronological sorting.
-            if not timestamp in scIdsByDate:
-                scIdsByDate[timestamp] = []
-            scIdsByDate[timestamp].append(scId)
-
             #--- Find sections and get characters, locations, items, and arcs.
-            self.novel.sections[scId].scType = 1
-            # type = "Unused"
-            scCharacters = []
-            scLocations = []
-            scItems = []
-            for evtRel in event['relationships']:
-
-                # Make the section "Normal", if the event has
-                # a "Narrative" relationship.
-                if evtRel['role'] == self._roleArcGuid:
-                    if evtRel['entity'] == self._entityNarrativeGuid:
-                        self.novel.sections[scId].scType = 0
-                        if timestamp > self._timestampMax:
-                            self._timestampMax = timestamp
-
-                # Add character to the list, if the event has
-                # a character role relationship.
-                elif evtRel['role'] == self._roleCharacterGuid:
-                    crId = crIdsByGuid[evtRel['entity']]
-                    scCharacters.append(crId)
-
-                # Add location to the list, if the event has
-                # a location role relationship.
-                elif evtRel['role'] == self._roleLocationGuid:
-                    lcId = lcIdsByGuid[evtRel['entity']]
-                    scLocations.append(lcId)
-
-                # Add item to the list, if the event has
-                # an item role relationship.
-                elif evtRel['role'] == self._roleItemGuid:
-                    itId = itIdsByGuid[evtRel['entity']]
-                    scItems.append(itId)
-
-                # Add arc assignment to the section, if the event has
-                # a "Plotline" relationship.
-                elif evtRel['role'] == self._rolePlotlineGuid:
-                    acId = acIdsByGuid[evtRel['entity']]
-                    self.novel.sections[scId].scPlotLines.append(acId)
-                    # adding arc reference to the section
-
-                    # Add section reference to the arc.
-                    acSections = self.novel.plotLines[acId].sections
-                    if acSections is None:
-                        acSections = []
-                    acSections.append(scId)
-                    self.novel.plotLines[acId].sections = acSections
+
+            # Make the section "Normal", if the event has
+            # a "Narrative" relationship.
+            if isNarrative:
+                self.novel.sections[scId].scType = 0
+                narrativeIndices.append(i)
+            else:
+                self.novel.sections[scId].scType = 1
+                # type = "Unused"
+
+            # Get the characters, locations, and items from the
+            # role relationships.
+            scCharacters = [
+                crIdsByGuid[crGuid]
+                for crGuid in entityGuids[RelationshipEngine.CHARACTER]
+            ]
+            scLocations = [
+                lcIdsByGuid[lcGuid]
+                for lcGuid in entityGuids[RelationshipEngine.LOCATION]
+            ]
+            scItems = [
+                itIdsByGuid[itGuid]
+                for itGuid in entityGuids[RelationshipEngine.ITEM]
+            ]
+
+            # Add arc assignments to the section, if the event has
+            # "Plotline" relationships.
+            for acGuid in entityGuids[RelationshipEngine.PLOTLINE]:
+                acId = acIdsByGuid[acGuid]
+                self.novel.sections[scId].scPlotLines.append(acId)
+                # adding arc reference to the section
+
+                # Add section reference to the arc.
+                acSections = self.novel.plotLines[acId].sections
+                if acSections is None:
+                    acSections = []
+                acSections.append(scId)
+                self.novel.plotLines[acId].sections = acSections
 
             # Write the character/location/item lists to the section.
             if scCharacters:
@@ -866,7 +1153,43 @@ class JsonTimeline2(File):
                 self.novel.sections[scId].locations = scLocations
             if scItems:
                 self.novel.sections[scId].items = scItems
-        return narrativeEvents, scIdsByDate
+
+        #--- Get the highest display ID and "Narrative" timestamp.
+        self._displayIdMax = max(
+            self._displayIdMax,
+            self._eventStore.get_max_display_id(scIdsByEvent),
+        )
+        self._timestampMax = max(
+            self._timestampMax,
+            self._eventStore.get_max_timestamp(narrativeIndices),
+        )
+
+        #--- Sort the sections by date/time.
+        srtScIds = [
+            scIdsByEvent[i]
+            for i in self._eventStore.sort_chronologically(scIdsByEvent)
+        ]
+        return narrativeEvents, srtScIds
+
+    def _save_timeline(self):
+        jsonData = dict(self._jsonData)
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        # The JSON events have no reference cycles, so the
+        # garbage collector's passes would only slow down here.
+        try:
+            jsonData['events'] = [event.to_json() for event in self._events]
+        finally:
+            if gcEnabled:
+                gc.enable()
+        self.upToDate = not save_timeline(
+            jsonData,
+            self.filePath,
+            compression=self._compression,
+            compresslevel=self._compressLevel,
+        )
+        if self._timelineCache is not None:
+            self._timelineCache.store(self.filePath, jsonData)
 
     def _set_reference_date(self, novel):
         self.referenceDate = datetime.today()
@@ -879,7 +1202,7 @@ class JsonTimeline2(File):
 
     def _w_check_source_arcs(self, source, relatedArcs):
         """Ignore elements that are not related to a section."""
-        srcArcTitles = []
+        srcArcTitles = set()
         for acId in source.plotLines:
             if acId in relatedArcs:
                 if source.plotLines[acId].title in srcArcTitles:
@@ -888,11 +1211,11 @@ class JsonTimeline2(File):
                             source.plotLines[acId].title)
                     )
 
-                srcArcTitles.append(source.plotLines[acId].title)
+                srcArcTitles.add(source.plotLines[acId].title)
 
     def _w_check_source_characters(self, source, relatedCharacters):
         """Ignore elements that are not related to a section."""
-        srcChrNames = []
+        srcChrNames = set()
         for crId in source.characters:
             if crId in relatedCharacters:
                 if source.characters[crId].title in srcChrNames:
@@ -901,11 +1224,11 @@ class JsonTimeline2(File):
                             source.characters[crId].title)
                     )
 
-                srcChrNames.append(source.characters[crId].title)
+                srcChrNames.add(source.characters[crId].title)
 
     def _w_check_source_locations(self, source, relatedLocations):
         """Ignore elements that are not related to a section."""
-        srcLocTitles = []
+        srcLocTitles = set()
         for lcId in source.locations:
             if lcId in relatedLocations:
                 if source.locations[lcId].title in srcLocTitles:
@@ -914,11 +1237,11 @@ class JsonTimeline2(File):
                             source.locations[lcId].title)
                     )
 
-                srcLocTitles.append(source.locations[lcId].title)
+                srcLocTitles.add(source.locations[lcId].title)
 
     def _w_check_source_items(self, source, relatedItems):
         """Ignore elements that are not related to a section."""
-        srcItmTitles = []
+        srcItmTitles = set()
         for itId in source.items:
             if itId in relatedItems:
                 if source.items[itId].title in srcItmTitles:
@@ -927,10 +1250,10 @@ class JsonTimeline2(File):
                             source.items[itId].title)
                     )
 
-                srcItmTitles.append(source.items[itId].title)
+                srcItmTitles.add(source.items[itId].title)
 
     def _w_check_source_sections(self, source):
-        srcScnTitles = []
+        srcScnTitles = set()
         for chId in source.chapters:
             if source.chapters[chId].isTrash:
                 continue
@@ -942,12 +1265,15 @@ class JsonTimeline2(File):
                             source.sections[scId].title)
                     )
 
-                srcScnTitles.append(source.sections[scId].title)
+                srcScnTitles.add(source.sections[scId].title)
         return srcScnTitles
 
-    def _w_check_target_arcs(self):
+    def _w_check_target_arcs(self, mappedIds):
         acIdsByTitle = {}
         for acId in self.novel.plotLines:
+            if acId in mappedIds:
+                continue
+
             if self.novel.plotLines[acId].title in acIdsByTitle:
                 raise RuntimeError(
                     _('Ambiguous Aeon arc "{}".').format(
@@ -957,9 +1283,12 @@ class JsonTimeline2(File):
             acIdsByTitle[self.novel.plotLines[acId].title] = acId
         return acIdsByTitle
 
-    def _w_check_target_characters(self):
+    def _w_check_target_characters(self, mappedIds):
         crIdsByTitle = {}
         for crId in self.novel.characters:
+            if crId in mappedIds:
+                continue
+
             if self.novel.characters[crId].title in crIdsByTitle:
                 raise RuntimeError(
                     _('Ambiguous Aeon character "{}".').format(
@@ -969,9 +1298,12 @@ class JsonTimeline2(File):
             crIdsByTitle[self.novel.characters[crId].title] = crId
         return crIdsByTitle
 
-    def _w_check_target_items(self):
+    def _w_check_target_items(self, mappedIds):
         itIdsByTitle = {}
         for itId in self.novel.items:
+            if itId in mappedIds:
+                continue
+
             if self.novel.items[itId].title in itIdsByTitle:
                 raise RuntimeError(
                     _('Ambiguous Aeon item "{}".').format(
@@ -981,9 +1313,12 @@ class JsonTimeline2(File):
             itIdsByTitle[self.novel.items[itId].title] = itId
         return itIdsByTitle
 
-    def _w_check_target_locations(self):
+    def _w_check_target_locations(self, mappedIds):
         lcIdsByTitle = {}
         for lcId in self.novel.locations:
+            if lcId in mappedIds:
+                continue
+
             if self.novel.locations[lcId].title in lcIdsByTitle:
                 raise RuntimeError(
                     _('Ambiguous Aeon location "{}".').format(
@@ -993,9 +1328,12 @@ class JsonTimeline2(File):
             lcIdsByTitle[self.novel.locations[lcId].title] = lcId
         return lcIdsByTitle
 
-    def _w_check_target_sections(self):
+    def _w_check_target_sections(self, mappedIds):
         scIdsByTitle = {}
         for scId in self.novel.sections:
+            if scId in mappedIds:
+                continue
+
             if self.novel.sections[scId].title in scIdsByTitle:
 
                 raise RuntimeError(
@@ -1014,7 +1352,7 @@ class JsonTimeline2(File):
             if self.novel.sections[scId].scType == 1:
                 continue
 
-            self._trashEvents.append(scId)
+            self._trashEvents.add(scId)
 
     def _w_create_json_narrative_arc_if_missing(self):
         if self._entityNarrativeGuid is not None:
@@ -1025,7 +1363,7 @@ class JsonTimeline2(File):
         )
         self._jsonData['entities'].append(
             {
-                'entityType':self._typeArcGuid,
+                'entityType':self._tpl.typeArcGuid,
                 'guid':self._entityNarrativeGuid,
                 'icon':'book',
                 'name':self._entityNarrative,
@@ -1036,282 +1374,90 @@ class JsonTimeline2(File):
             )
         self._arcCount += 1
 
-    def _w_create_json_property_desc_if_missing(self):
-        if self._propertyDescGuid is not None:
-            return
-
-        n = len(self._jsonData['template']['properties'])
-        self._propertyDescGuid = self._guidGen.get_guid('_propertyDescGuid')
-        self._jsonData['template']['properties'].append(
-            {
-                'calcMode':'default',
-                'calculate':False,
-                'fadeEvents':False,
-                'guid':self._propertyDescGuid,
-                'icon':'tag',
-                'isMandatory':False,
-                'name':self._propertyDesc,
-                'sortOrder':n,
-                'type':'multitext'
-            }
-        )
-
-    def _w_create_json_property_moonphase_if_missing(self):
-        if self._propertyMoonphaseGuid is not None:
-            return
-
-        if not self._addMoonphase:
-            return
-
-        n = len(self._jsonData['template']['properties'])
-        self._propertyMoonphaseGuid = self._guidGen.get_guid(
-            '_propertyMoonphaseGuid'
-        )
-        self._jsonData['template']['properties'].append(
-            {
-                'calcMode':'default',
-                'calculate':False,
-                'fadeEvents':False,
-                'guid':self._propertyMoonphaseGuid,
-                'icon':'flag',
-                'isMandatory':False,
-                'name':self._propertyMoonphase,
-                'sortOrder':n,
-                'type':'text'
-            }
-        )
-
-    def _w_create_json_property_notes_if_missing(self):
-        if self._propertyNotesGuid is not None:
-            return
-
-        for tplPrp in self._jsonData['template']['properties']:
-            tplPrp['sortOrder'] += 1
-
-        self._propertyNotesGuid = self._guidGen.get_guid('_propertyNotesGuid')
-        self._jsonData['template']['properties'].insert(
-            0,
-            {
-                'calcMode':'default',
-                'calculate':False,
-                'fadeEvents':False,
-                'guid':self._propertyNotesGuid,
-                'icon':'tag',
-                'isMandatory':False,
-                'name':self._propertyNotes,
-                'sortOrder':0,
-                'type':'multitext'
-            }
-        )
-
-    def _w_create_json_role_arc_if_missing(self):
-        if self._roleArcGuid is not None:
-            return
-
-        for entityType in self._jsonData['template']['types']:
-            if entityType['name'] == self._typeArc:
-                self._roleArcGuid = self._guidGen.get_guid('_roleArcGuid')
-                entityType['roles'].append(
-                    {
-                        'allowsMultipleForEntity':True,
-                        'allowsMultipleForEvent':True,
-                        'allowsPercentAllocated':False,
-                        'guid':self._roleArcGuid,
-                        'icon':'circle text',
-                        'mandatoryForEntity':False,
-                        'mandatoryForEvent':False,
-                        'name':self._roleArc,
-                        'sortOrder':0})
-                return
-
-    def _w_create_json_role_character_if_missing(self):
-        if self._roleCharacterGuid is not None:
-            return
-
-        for entityType in self._jsonData['template']['types']:
-            if entityType['name'] == self._typeCharacter:
-                self._roleCharacterGuid = self._guidGen.get_guid(
-                    '_roleCharacterGuid'
-                )
-                entityType['roles'].append(
-                    {
-                        'allowsMultipleForEntity':True,
-                        'allowsMultipleForEvent':True,
-                        'allowsPercentAllocated':False,
-                        'guid':self._roleCharacterGuid,
-                        'icon':'circle text',
-                        'mandatoryForEntity':False,
-                        'mandatoryForEvent':False,
-                        'name':self._roleCharacter,
-                        'sortOrder':0
-                    }
-                )
-                return
-
-    def _w_create_json_role_item_if_missing(self):
-        if self._roleItemGuid is not None:
-            return
-
-        for entityType in self._jsonData['template']['types']:
-            if entityType['name'] == self._typeItem:
-                self._roleItemGuid = self._guidGen.get_guid('_roleItemGuid')
-                entityType['roles'].append(
-                    {
-                        'allowsMultipleForEntity':True,
-                        'allowsMultipleForEvent':True,
-                        'allowsPercentAllocated':False,
-                        'guid':self._roleItemGuid,
-                        'icon':'circle text',
-                        'mandatoryForEntity':False,
-                        'mandatoryForEvent':False,
-                        'name':self._roleItem,
-                        'sortOrder':0
-                    }
-                )
-                return
+    def _w_delete_trashed_events(self):
+        trashedTitles = set()
+        for scId in self._trashEvents:
+            trashedTitles.add(self.novel.sections[scId].title)
+        events = []
+        for event in self._events:
+            if event.title in trashedTitles:
+                self._touchedGuids.add(event.guid)
+            else:
+                events.append(event)
+        self._events = events
 
-    def _w_create_json_role_location_if_missing(self):
-        if self._roleLocationGuid is not None:
-            return
+    def _w_get_date(self, section):
+        """Return the date of the event for a source section.
+        
+        Positional arguments:
+            section -- source Section instance
+        
+        An unspecific section date is converted, using the reference date.
+        """
+        if section.day is not None:
+            sectionDelta = timedelta(days=int(section.day))
+            return (self.referenceDate + sectionDelta).isoformat().split('T')[0]
 
-        for entityType in self._jsonData['template']['types']:
-            if entityType['name'] == self._typeLocation:
-                self._roleLocationGuid = self._guidGen.get_guid(
-                    '_roleLocationGuid'
-                )
-                entityType['roles'].append(
-                    {
-                        'allowsMultipleForEntity':True,
-                        'allowsMultipleForEvent':True,
-                        'allowsPercentAllocated':False,
-                        'guid':self._roleLocationGuid,
-                        'icon':'circle text',
-                        'mandatoryForEntity':False,
-                        'mandatoryForEvent':False,
-                        'name':self._roleLocation,
-                        'sortOrder':0
-                    }
-                )
-                return
+        if section.date is None:
+            return self.referenceDate.isoformat().split('T')[0]
 
-    def _w_create_json_role_plotline_if_missing(self):
-        if self._rolePlotlineGuid is not None:
-            return
+        return section.date
 
-        for entityType in self._jsonData['template']['types']:
-            if entityType['name'] == self._typeArc:
-                self._rolePlotlineGuid = self._guidGen.get_guid(
-                    '_roleStorylineGuid'
-                )
-                entityType['roles'].append(
-                    {
-                        'allowsMultipleForEntity':True,
-                        'allowsMultipleForEvent':True,
-                        'allowsPercentAllocated':False,
-                        'guid':self._rolePlotlineGuid,
-                        'icon':'circle filled text',
-                        'mandatoryForEntity':False,
-                        'mandatoryForEvent':False,
-                        'name':self._rolePlotline,
-                        'sortOrder':0
-                    }
+    def _w_get_fingerprint(self, section, guidsById):
+        """Return a hash of the source section data written to the event.
+        
+        Positional arguments:
+            section -- source Section instance
+            guidsById -- dictionary of the timeline GUIDs by source element ID.
+        """
+        relatedGuids = []
+        for elemIds in (
+            section.characters,
+            section.locations,
+            section.items,
+            section.scPlotLines,
+        ):
+            if elemIds is None:
+                relatedGuids.append(None)
+            else:
+                relatedGuids.append(
+                    [guidsById.get(elemId, None) for elemId in elemIds]
                 )
-                return
-
-    def _w_create_json_type_arc_if_missing(self):
-        if self._typeArcGuid is not None:
-            return
-
-        self._typeArcGuid = self._guidGen.get_guid('typeArcGuid')
-        typeCount = len(self._jsonData['template']['types'])
-        self._jsonData['template']['types'].append(
-            {
-                'color':'iconYellow',
-                'guid':self._typeArcGuid,
-                'icon':'book',
-                'name':self._typeArc,
-                'persistent':True,
-                'roles':[],
-                'sortOrder':typeCount
-            }
-        )
-
-    def _w_create_json_type_character_if_missing(self):
-        if self._typeCharacterGuid is not None:
-            return
-
-        self._typeCharacterGuid = self._guidGen.get_guid('_typeCharacterGuid')
-        self._roleCharacterGuid = self._guidGen.get_guid('_roleCharacterGuid')
-        typeCount = len(self._jsonData['template']['types'])
-        self._jsonData['template']['types'].append(
-            {
-                'color':'iconRed',
-                'guid':self._typeCharacterGuid,
-                'icon':'person',
-                'name':self._typeCharacter,
-                'persistent':False,
-                'roles':[],
-                'sortOrder':typeCount
-            }
-        )
-
-    def _w_create_json_type_item_if_missing(self):
-        if self._typeItemGuid is not None:
-            return
-
-        self._typeItemGuid = self._guidGen.get_guid('_typeItemGuid')
-        self._roleItemGuid = self._guidGen.get_guid('_roleItemGuid')
-        typeCount = len(self._jsonData['template']['types'])
-        self._jsonData['template']['types'].append(
-            {
-                'color':'iconPurple',
-                'guid':self._typeItemGuid,
-                'icon':'cube',
-                'name':self._typeItem,
-                'persistent':True,
-                'roles':[],
-                'sortOrder':typeCount
-            }
-        )
-
-    def _w_create_json_type_location_if_missing(self):
-        if self._typeLocationGuid is not None:
-            return
-
-        self._typeLocationGuid = self._guidGen.get_guid('_typeLocationGuid')
-        self._roleLocationGuid = self._guidGen.get_guid('_roleLocationGuid')
-        typeCount = len(self._jsonData['template']['types'])
-        self._jsonData['template']['types'].append(
-            {
-                'color':'iconOrange',
-                'guid':self._typeLocationGuid,
-                'icon':'map',
-                'name':self._typeLocation,
-                'persistent':True,
-                'roles':[],
-                'sortOrder':typeCount
-            }
+        duration = [
+            '0' if lasts is None else lasts
+            for lasts in (
+                section.lastsDays,
+                section.lastsHours,
+                section.lastsMinutes,
+            )
+        ]
+        sectionData = (
+            section.title,
+            self._w_get_date(section),
+            section.time,
+            duration,
+            section.desc,
+            section.tags,
+            section.scType,
+            relatedGuids,
+            self._entityNarrativeGuid,
+            self._tpl.propertyDescGuid,
+            self._tpl.propertyNotesGuid,
+            self._tpl.propertyMoonphaseGuid,
+            self._tpl.roleCharacterGuid,
+            self._tpl.roleLocationGuid,
+            self._tpl.roleItemGuid,
+            self._tpl.roleArcGuid,
+            self._tpl.rolePlotlineGuid,
         )
-
-    def _w_delete_trashed_events(self, scIdsByTitle):
-        jEvents = []
-        for jEvent in self._jsonData['events']:
-            jTitle = jEvent['title']
-            if jTitle in scIdsByTitle:
-                scId = scIdsByTitle[jTitle]
-                if not scId in self._trashEvents:
-                    jEvents.append(jEvent)
-            else:
-                jEvents.append(jEvent)
-        self._jsonData['events'] = jEvents
+        return hashlib.sha1(repr(sectionData).encode('utf-8')).hexdigest()
 
     def _w_get_json_character_date(self, isoDate):
         """Return the character's birth or death date, if any."""
-        charaDate = datetime.fromisoformat(isoDate)
-        timestamp = int((charaDate - datetime.min).total_seconds())
+        timestamp = self._tsConv.get_timestamp(isoDate)
         return {
             "precision": "day",
-            "rangePropertyGuid": self._tplDateGuid,
+            "rangePropertyGuid": self._tpl.dateGuid,
             "timestamp": timestamp
         }
 
@@ -1319,13 +1465,38 @@ class JsonTimeline2(File):
         self._displayIdMax += 1
         return str(int(self._displayIdMax))
 
-    def _w_get_new_json_event(self, section):
+    def _w_get_mapped_ids(self, source):
+        """Return a dictionary with the target element IDs by source ID.
+        
+        Only the source elements that the last sync has mapped 
+        to an event or entity of the timeline are listed.
+        """
+        targetsByGuid = {}
+        # key: GUID
+        # value: tuple (target element ID, source elements of the same kind)
+        for srcElements, guidsById in (
+            (source.sections, self._sectionGuidsById),
+            (source.characters, self._characterGuidsById),
+            (source.locations, self._locationGuidsById),
+            (source.items, self._itemGuidsById),
+            (source.plotLines, self._arcGuidsById),
+        ):
+            for elemId, guid in guidsById.items():
+                targetsByGuid[guid] = (elemId, srcElements)
+        mappedIds = {}
+        for srcId, guid in self._syncMap.guidsById.items():
+            target = targetsByGuid.get(guid, None)
+            if target is not None and srcId in target[1]:
+                mappedIds[srcId] = target[0]
+        return mappedIds
+
+    def _w_get_new_json_event(self, section, guid):
         """Create a new event from a section."""
         event = {
             'attachments': [],
             'color': '',
             'displayId': self._w_get_display_id(),
-            'guid': self._guidGen.get_guid(f'section{section.title}'),
+            'guid': guid,
             'links': [],
             'locked': False,
             'priority': 500,
@@ -1336,7 +1507,7 @@ class JsonTimeline2(File):
                         'precision': 'minute',
                         'timestamp': self.DATE_LIMIT
                     },
-                    'rangeProperty': self._tplDateGuid,
+                    'rangeProperty': self._tpl.dateGuid,
                     'span': {},
                 }
             ],
@@ -1345,49 +1516,41 @@ class JsonTimeline2(File):
             'title': section.title,
             'values': [
                 {
-                    'property': self._propertyNotesGuid,
+                    'property': self._tpl.propertyNotesGuid,
                     'value': ''
                 },
                 {
-                    'property': self._propertyDescGuid,
+                    'property': self._tpl.propertyDescGuid,
                     'value': ''
                 }
             ],
         }
         if section.scType == 0:
-            event['color'] = self._colors[self._sectionColor]
+            event['color'] = self._tpl.colors[self._sectionColor]
         else:
-            event['color'] = self._colors[self._eventColor]
+            event['color'] = self._tpl.colors[self._eventColor]
         return event
 
     def _w_get_related_elements(self, source):
-        # Return lists of characters, locations, items, and arcs
+        # Return sets of characters, locations, items, and arcs
         # assigned to sections.
-        relatedCharacters = []
-        relatedLocations = []
-        relatedItems = []
-        relatedArcs = []
+        relatedCharacters = set()
+        relatedLocations = set()
+        relatedItems = set()
+        relatedArcs = set()
         for chId in source.chapters:
             if source.chapters[chId].isTrash:
                 continue
 
             for scId in source.tree.get_children(chId):
                 if source.sections[scId].characters:
-                    relatedCharacters = list(set(
-                        relatedCharacters + source.sections[scId].characters
-                    ))
+                    relatedCharacters.update(source.sections[scId].characters)
                 if source.sections[scId].locations:
-                    relatedLocations = list(set(
-                            relatedLocations + source.sections[scId].locations
-                    ))
+                    relatedLocations.update(source.sections[scId].locations)
                 if source.sections[scId].items:
-                    relatedItems = list(set(
-                        relatedItems + source.sections[scId].items
-                    ))
+                    relatedItems.update(source.sections[scId].items)
                 if source.sections[scId].scPlotLines:
-                    relatedArcs = list(set(
-                        relatedArcs + source.sections[scId].scPlotLines
-                    ))
+                    relatedArcs.update(source.sections[scId].scPlotLines)
         return relatedCharacters, relatedLocations, relatedItems, relatedArcs
 
     def _w_get_span(self, section):
@@ -1424,32 +1587,145 @@ class JsonTimeline2(File):
                 isoDt = section.date
                 if section.time:
                     isoDt = (f'{isoDt} {section.time}')
-            timestamp = int(
-                (datetime.fromisoformat(isoDt) - datetime.min).total_seconds()
-            )
+            timestamp = self._tsConv.get_timestamp(isoDt)
         except:
             pass
         return timestamp
 
-    def _w_update_arcs_from_source(self, source, acIdsByTitle, linkedArcs):
+    def _w_get_unchanged_sections(self, source, mappedIds):
+        """Return a set with the IDs of the source sections to be skipped.
+        
+        Positional arguments:
+            source -- Novel instance to be written.
+            mappedIds -- dictionary of the target element IDs by source ID.
+        
+        A section is skipped, if its fingerprint is the one stored 
+        by the last sync, and the timeline has not been changed since.
+        """
+        unchangedIds = set()
+        if (
+            self._timelineCrc is None
+            or self._timelineCrc != self._syncMap.timelineCrc
+        ):
+            return unchangedIds
+
+        storedFingerprints = self._syncMap.fingerprints
+        guidsById = self._syncMap.guidsById
+        for srcId in source.sections:
+            section = source.sections[srcId]
+            if section.scType != 0 or not srcId in mappedIds:
+                continue
+
+            guid = self._sectionGuidsById[mappedIds[srcId]]
+            fingerprint = self._w_get_fingerprint(section, guidsById)
+            if storedFingerprints.get(guid, None) == fingerprint:
+                unchangedIds.add(srcId)
+                self._eventFingerprints[guid] = fingerprint
+        return unchangedIds
+
+    def _w_rename_mapped_elements(
+            self,
+            source,
+            mappedIds,
+            scIdsByTitle,
+            crIdsByTitle,
+            lcIdsByTitle,
+            itIdsByTitle,
+            acIdsByTitle
+    ):
+        """Give the mapped target elements the titles of their source elements.
+        
+        Rename the corresponding JSON entities as well; 
+        the JSON events are renamed when updated from their sections.
+        Source elements whose new title is taken by an unmapped 
+        target element are removed from mappedIds, 
+        so they are matched by title, as without sync map.
+        """
+        entitiesByGuid = {}
+        for entity in self._jsonData['entities']:
+            entitiesByGuid[entity['guid']] = entity
+        for srcElements, elements, guidsById, idsByTitle in (
+            (
+                source.sections,
+                self.novel.sections,
+                self._sectionGuidsById,
+                scIdsByTitle,
+            ),
+            (
+                source.characters,
+                self.novel.characters,
+                self._characterGuidsById,
+                crIdsByTitle,
+            ),
+            (
+                source.locations,
+                self.novel.locations,
+                self._locationGuidsById,
+                lcIdsByTitle,
+            ),
+            (
+                source.items,
+                self.novel.items,
+                self._itemGuidsById,
+                itIdsByTitle,
+            ),
+            (
+                source.plotLines,
+                self.novel.plotLines,
+                self._arcGuidsById,
+                acIdsByTitle,
+            ),
+        ):
+            for srcId in srcElements:
+                elemId = mappedIds.get(srcId, None)
+                if elemId is None:
+                    continue
+
+                title = srcElements[srcId].title
+                if title == elements[elemId].title:
+                    continue
+
+                if self._match_mapped_element(
+                    elements,
+                    elemId,
+                    title,
+                    idsByTitle,
+                ) != elemId:
+                    del mappedIds[srcId]
+                    continue
+
+                entity = entitiesByGuid.get(guidsById[elemId], None)
+                if entity is not None:
+                    entity['name'] = elements[elemId].title
+
+    def _w_update_arcs_from_source(
+            self,
+            source,
+            mappedIds,
+            acIdsByTitle,
+            linkedArcs
+    ):
         arcCount = len(self.novel.plotLines)
         acIdsBySrcId = {}
+        acIdAlloc = IdAllocator(self.novel.plotLines, prefix=PLOT_LINE_PREFIX)
         for srcAcId in source.plotLines:
-            if source.plotLines[srcAcId].title in acIdsByTitle:
+            if srcAcId in mappedIds:
+                acIdsBySrcId[srcAcId] = mappedIds[srcAcId]
+            elif source.plotLines[srcAcId].title in acIdsByTitle:
                 acIdsBySrcId[srcAcId] = (
                     acIdsByTitle[source.plotLines[srcAcId].title]
                 )
             elif srcAcId in linkedArcs:
 
                 #--- Create a new Arc if it is assigned to at least one section.
-                acId = new_id(self.novel.plotLines, prefix=PLOT_LINE_PREFIX)
+                acId = acIdAlloc.new_id()
                 acIdsBySrcId[srcAcId] = acId
                 self.novel.plotLines[acId] = source.plotLines[srcAcId]
                 arcName = self.novel.plotLines[acId].title
                 newGuid = self._guidGen.get_guid(f'{acId}{arcName}')
                 self._arcGuidsById[acId] = newGuid
                 self._jsonData['entities'].append({
-                    'entityType':self._typeArcGuid,
+                    'entityType':self._tpl.typeArcGuid,
                     'guid':newGuid,
                     'icon':'book',
                     'name':arcName,
@@ -1463,14 +1739,24 @@ class JsonTimeline2(File):
     def _w_update_characters_from_source(
             self,
             source,
+            mappedIds,
             crIdsByTitle,
             linkedCharacters
         ):
         chrCount = len(self.novel.characters)
         crIdsBySrcId = {}
+        crIdAlloc = IdAllocator(self.novel.characters, prefix=CHARACTER_PREFIX)
+        crIdsByGuid = {
+            guid: crId for crId, guid in self._characterGuidsById.items()
+        }
+        # the characters read from the timeline
         srcIdsbyCrId = {}
         for srcCrId in source.characters:
-            if source.characters[srcCrId].title in crIdsByTitle:
+            if srcCrId in mappedIds:
+                crId = mappedIds[srcCrId]
+                crIdsBySrcId[srcCrId] = crId
+                srcIdsbyCrId[crId] = srcCrId
+            elif source.characters[srcCrId].title in crIdsByTitle:
                 crId = crIdsByTitle[source.characters[srcCrId].title]
                 crIdsBySrcId[srcCrId] = crId
                 srcIdsbyCrId[crId] = srcCrId
@@ -1478,7 +1764,7 @@ class JsonTimeline2(File):
 
                 #--- Create a new character if it is assigned
                 #--- to at least one section.
-                crId = new_id(self.novel.characters, prefix=CHARACTER_PREFIX)
+                crId = crIdAlloc.new_id()
                 crIdsBySrcId[srcCrId] = crId
                 srcIdsbyCrId[crId] = srcCrId
                 self.novel.characters[crId] = source.characters[srcCrId]
@@ -1497,7 +1783,7 @@ class JsonTimeline2(File):
                     jsonCharacter['destroyRangePosition'] = (
                         self._w_get_json_character_date(deathDate)
                     )
-                jsonCharacter['entityType'] = self._typeCharacterGuid
+                jsonCharacter['entityType'] = self._tpl.typeCharacterGuid
                 jsonCharacter['guid'] = newGuid
                 jsonCharacter['icon'] = 'person'
                 jsonCharacter['name'] = self.novel.characters[crId].title
@@ -1509,14 +1795,14 @@ class JsonTimeline2(File):
 
         # Update birth/death date.
         for entity in self._jsonData['entities']:
-            if not entity['entityType'] == self._typeCharacterGuid:
+            if not entity['entityType'] == self._tpl.typeCharacterGuid:
                 continue
 
-            if not entity['name'] in crIdsByTitle:
+            if not entity['guid'] in crIdsByGuid:
                 continue
 
             # entity is a character.
-            crId = crIdsByTitle[entity['name']]
+            crId = crIdsByGuid[entity['guid']]
             srcCrId = srcIdsbyCrId[crId]
             birthDate = source.characters[srcCrId].birthDate
             if birthDate:
@@ -1535,142 +1821,182 @@ class JsonTimeline2(File):
 
         return crIdsBySrcId
 
-    def _w_update_json_events_from_sections(self, scIdsByTitle):
-        for jEvent in self._jsonData['events']:
-            if not jEvent['title'] in scIdsByTitle:
+    def _w_update_json_events_from_sections(
+            self,
+            scIdsByTitle,
+            scIdsByGuid,
+            unchangedGuids
+    ):
+        """Update the events from their sections.
+        
+        Positional arguments:
+            scIdsByTitle -- dictionary of the section IDs by title.
+            scIdsByGuid -- dictionary of the section IDs by event GUID,
+                           for the sections mapped by the last sync.
+            unchangedGuids -- set of the GUIDs of the events to be skipped.
+        """
+        eventSections = []
+        for event in self._events:
+            if event.guid in unchangedGuids:
+                # The section is unchanged since the last sync.
                 continue
 
-            scId = scIdsByTitle[jEvent['title']]
+            scId = scIdsByGuid.get(event.guid, None)
+            if scId is None:
+                scId = scIdsByTitle.get(event.title, None)
+                if scId is None:
+                    continue
+
+            eventSections.append((event, self.novel.sections[scId]))
+        if self._tpl.propertyMoonphaseGuid is not None:
+            # Compute the moon phase once for each distinct date.
+            self._moonPhases.compute_all(
+                section.date for __, section in eventSections
+            )
+        self._relations.set_roles(self._tpl, self._entityNarrativeGuid)
+        for event, section in eventSections:
+            eventChanged = False
+
+            #--- Set the event title, if the section has been renamed.
+            if event.title != section.title:
+                event.title = section.title
+                eventChanged = True
 
             #--- Set event date/time/span.
-            if (
-                jEvent['rangeValues'][0]['position']['timestamp']
-                >= self.DATE_LIMIT
-            ):
-                jEvent['rangeValues'][0]['span'] = (
-                    self._w_get_span(self.novel.sections[scId])
-                )
-                jEvent['rangeValues'][0]['position']['timestamp'] = (
-                    self._w_get_timestamp(self.novel.sections[scId])
-                )
+            rangeValue = event.rangeValues[0]
+            if rangeValue.timestamp >= self.DATE_LIMIT:
+                span = self._w_get_span(section)
+                if rangeValue.span != span:
+                    rangeValue.span = span
+                    eventChanged = True
+                timestamp = self._w_get_timestamp(section)
+                if rangeValue.timestamp != timestamp:
+                    rangeValue.timestamp = timestamp
+                    eventChanged = True
 
             #--- Calculate moon phase.
-            if self._propertyMoonphaseGuid is not None:
-                eventMoonphase = self._nvSvc.get_moon_phase_str(
-                    self.novel.sections[scId].date
+            if self._tpl.propertyMoonphaseGuid is not None:
+                eventMoonphase = self._moonPhases.get_moon_phase_str(
+                    section.date
                 )
             else:
                 eventMoonphase = ''
 
             #--- Set section description, notes, and moon phase.
             hasMoonphase = False
-            for evtVal in jEvent['values']:
+            for evtVal in event.values:
 
                 # Set section description.
-                if evtVal['property'] == self._propertyDescGuid:
-                    if self.novel.sections[scId].desc:
-                        evtVal['value'] = self.novel.sections[scId].desc
+                if evtVal['property'] == self._tpl.propertyDescGuid:
+                    if section.desc and evtVal['value'] != section.desc:
+                        evtVal['value'] = section.desc
+                        eventChanged = True
 
                 # Set section notes.
-                elif evtVal['property'] == self._propertyNotesGuid:
-                    if self.novel.sections[scId].notes:
-                        evtVal['value'] = self.novel.sections[scId].notes
+                elif evtVal['property'] == self._tpl.propertyNotesGuid:
+                    if section.notes and evtVal['value'] != section.notes:
+                        evtVal['value'] = section.notes
+                        eventChanged = True
 
                 # Set moon phase.
-                elif evtVal['property'] == self._propertyMoonphaseGuid:
+                elif evtVal['property'] == self._tpl.propertyMoonphaseGuid:
+                    if evtVal['value'] != eventMoonphase:
                         evtVal['value'] = eventMoonphase
-                        hasMoonphase = True
+                        eventChanged = True
+                    hasMoonphase = True
 
             #--- Add missing event properties.
-            if not hasMoonphase and self._propertyMoonphaseGuid is not None:
-                jEvent['values'].append(
+            if not hasMoonphase and self._tpl.propertyMoonphaseGuid is not None:
+                event.values.append(
                     {
-                        'property': self._propertyMoonphaseGuid,
+                        'property': self._tpl.propertyMoonphaseGuid,
                         'value': eventMoonphase
                     }
                 )
+                eventChanged = True
 
             #--- Set section tags.
-            if self.novel.sections[scId].tags:
-                jEvent['tags'] = self.novel.sections[scId].tags
+            if section.tags and event.tags != section.tags:
+                event.tags = section.tags
+                eventChanged = True
 
             #--- Update characters, locations, items, and arcs.
 
-            # Delete assignments.
-            newRel = []
-            for evtRel in jEvent['relationships']:
-                if evtRel['role'] == self._roleCharacterGuid:
-                    continue
-
-                elif evtRel['role'] == self._roleLocationGuid:
-                    continue
-
-                elif evtRel['role'] == self._roleItemGuid:
-                    continue
-
-                elif evtRel['role'] == self._roleArcGuid:
-                    continue
-
-                else:
-                    newRel.append(evtRel)
+            # Keep the assignments that are not managed by novelibre.
+            __, __, newRel = self._relations.classify(event.relationships)
 
             # Add characters.
-            if self.novel.sections[scId].characters:
-                for crId in self.novel.sections[scId].characters:
+            if section.characters:
+                for crId in section.characters:
                     newRel.append(
-                        {
-                        'entity': self._characterGuidsById[crId],
-                        'percentAllocated': 1,
-                        'role': self._roleCharacterGuid,
-                        })
+                        (
+                            self._tpl.roleCharacterGuid,
+                            self._characterGuidsById[crId],
+                            1,
+                        ))
 
             # Add locations.
-            if self.novel.sections[scId].locations:
-                for lcId in self.novel.sections[scId].locations:
+            if section.locations:
+                for lcId in section.locations:
                     newRel.append(
-                        {
-                        'entity': self._locationGuidsById[lcId],
-                        'percentAllocated': 1,
-                        'role': self._roleLocationGuid,
-                        })
+                        (
+                            self._tpl.roleLocationGuid,
+                            self._locationGuidsById[lcId],
+                            1,
+                        ))
 
             # Add items.
-            if self.novel.sections[scId].items:
-                for itId in self.novel.sections[scId].items:
+            if section.items:
+                for itId in section.items:
                     newRel.append(
-                        {
-                        'entity': self._itemGuidsById[itId],
-                        'percentAllocated': 1,
-                        'role': self._roleItemGuid,
-                        })
+                        (
+                            self._tpl.roleItemGuid,
+                            self._itemGuidsById[itId],
+                            1,
+                        ))
 
             # Add arcs.
-            if self.novel.sections[scId].scType == 0:
+            if section.scType == 0:
                 # Add "Narrative" arc.
                 newRel.append(
-                    {
-                    'entity': self._entityNarrativeGuid,
-                    'percentAllocated': 1,
-                    'role': self._roleArcGuid,
-                    })
+                    (
+                        self._tpl.roleArcGuid,
+                        self._entityNarrativeGuid,
+                        1,
+                    ))
 
                 # Add plot line arcs.
-                if self.novel.sections[scId].scPlotLines:
-                    for acId in self.novel.sections[scId].scPlotLines:
+                if section.scPlotLines:
+                    for acId in section.scPlotLines:
                         newRel.append(
-                            {
-                            'entity': self._arcGuidsById[acId],
-                            'percentAllocated': 1,
-                            'role': self._rolePlotlineGuid,
-                            })
+                            (
+                                self._tpl.rolePlotlineGuid,
+                                self._arcGuidsById[acId],
+                                1,
+                            ))
+
+            # Replace the assignments only if they differ.
+            if newRel != event.relationships:
+                event.relationships = newRel
+                eventChanged = True
 
-            jEvent['relationships'] = newRel
+            if eventChanged:
+                self._touchedGuids.add(event.guid)
 
-    def _w_update_items_from_source(self, source, itIdsByTitle, linkedItems):
+    def _w_update_items_from_source(
+            self,
+            source,
+            mappedIds,
+            itIdsByTitle,
+            linkedItems
+    ):
         itmCount = len(self.novel.items)
         itIdsBySrcId = {}
+        itIdAlloc = IdAllocator(self.novel.items, prefix=ITEM_PREFIX)
         for srcItId in source.items:
-            if source.items[srcItId].title in itIdsByTitle:
+            if srcItId in mappedIds:
+                itIdsBySrcId[srcItId] = mappedIds[srcItId]
+            elif source.items[srcItId].title in itIdsByTitle:
                 itIdsBySrcId[srcItId] = (
                     itIdsByTitle[source.items[srcItId].title]
                 )
@@ -1678,7 +2004,7 @@ class JsonTimeline2(File):
 
                 #--- Create a new Item if it is assigned
                 #--- to at least one section.
-                itId = new_id(self.novel.items, prefix=ITEM_PREFIX)
+                itId = itIdAlloc.new_id()
                 itIdsBySrcId[srcItId] = itId
                 self.novel.items[itId] = source.items[srcItId]
                 newGuid = self._guidGen.get_guid(
@@ -1686,7 +2012,7 @@ class JsonTimeline2(File):
                 )
                 self._itemGuidsById[itId] = newGuid
                 self._jsonData['entities'].append({
-                        'entityType':self._typeItemGuid,
+                        'entityType':self._tpl.typeItemGuid,
                         'guid':newGuid,
                         'icon':'cube',
                         'name':self.novel.items[itId].title,
@@ -1699,13 +2025,17 @@ class JsonTimeline2(File):
     def _w_update_locations_from_source(
             self,
             source,
+            mappedIds,
             lcIdsByTitle,
             linkedLocations
     ):
         locCount = len(self.novel.locations)
         lcIdsBySrcId = {}
+        lcIdAlloc = IdAllocator(self.novel.locations, prefix=LOCATION_PREFIX)
         for srcLcId in source.locations:
-            if source.locations[srcLcId].title in lcIdsByTitle:
+            if srcLcId in mappedIds:
+                lcIdsBySrcId[srcLcId] = mappedIds[srcLcId]
+            elif source.locations[srcLcId].title in lcIdsByTitle:
                 lcIdsBySrcId[srcLcId] = (
                     lcIdsByTitle[source.locations[srcLcId].title]
                 )
@@ -1713,7 +2043,7 @@ class JsonTimeline2(File):
 
                 #--- Create a new location if it is assigned
                 #--- to at least one section.
-                lcId = new_id(self.novel.locations, prefix=LOCATION_PREFIX)
+                lcId = lcIdAlloc.new_id()
                 lcIdsBySrcId[srcLcId] = lcId
                 self.novel.locations[lcId] = source.locations[srcLcId]
                 newGuid = self._guidGen.get_guid(
@@ -1721,7 +2051,7 @@ class JsonTimeline2(File):
                 )
                 self._locationGuidsById[lcId] = newGuid
                 self._jsonData['entities'].append({
-                        'entityType':self._typeLocationGuid,
+                        'entityType':self._tpl.typeLocationGuid,
                         'guid':newGuid,
                         'icon':'map',
                         'name':self.novel.locations[lcId].title,
@@ -1735,33 +2065,68 @@ class JsonTimeline2(File):
     def _w_update_sections_from_source(
             self,
             source,
+            mappedIds,
             scIdsByTitle,
             crIdsBySrcId,
             lcIdsBySrcId,
             itIdsBySrcId,
-            acIdsBySrcId
+            acIdsBySrcId,
+            unchangedIds
     ):
+        scIdAlloc = IdAllocator(self.novel.sections, prefix=SECTION_PREFIX)
+
+        # Generate the GUIDs of the new events in one batch.
+        newTitles = [
+            source.sections[srcId].title for srcId in source.sections
+            if source.sections[srcId].scType == 0
+            and not srcId in mappedIds
+            and not source.sections[srcId].title in scIdsByTitle
+        ]
+        newEventGuids = dict(
+            zip(
+                newTitles,
+                self._guidGen.get_guids(
+                    f'section{title}' for title in newTitles
+                ),
+            )
+        )
+        scIdsBySrcId = {}
         for srcId in source.sections:
             if source.sections[srcId].scType != 0:
                 # Remove unused section from the "Narrative" arc.
-                if source.sections[srcId].title in scIdsByTitle:
+                if srcId in mappedIds:
+                    self.novel.sections[mappedIds[srcId]].scType = 1
+                elif source.sections[srcId].title in scIdsByTitle:
                     scId = scIdsByTitle[source.sections[srcId].title]
                     self.novel.sections[scId].scType = 1
                 continue
 
-            if source.sections[srcId].title in scIdsByTitle:
+            if srcId in unchangedIds:
+                # The event is up to date.
+                scIdsBySrcId[srcId] = mappedIds[srcId]
+                continue
+
+            if srcId in mappedIds:
+                scId = mappedIds[srcId]
+            elif source.sections[srcId].title in scIdsByTitle:
                 scId = scIdsByTitle[source.sections[srcId].title]
             else:
                 #--- Create a new section.
-                scId = new_id(self.novel.sections, prefix=SECTION_PREFIX)
+                scId = scIdAlloc.new_id()
                 self.novel.sections[scId] = self._nvSvc.new_section(
                     title=source.sections[srcId].title,
                     scType=source.sections[srcId].scType,
                     scene=source.sections[srcId].scene
                     )
                 scIdsByTitle[self.novel.sections[scId].title] = scId
-                newEvent = self._w_get_new_json_event(self.novel.sections[scId])
-                self._jsonData['events'].append(newEvent)
+                newEvent = EventRecord(self._w_get_new_json_event(
+                    self.novel.sections[scId],
+                    newEventGuids[source.sections[srcId].title],
+                ))
+                self._events.append(newEvent)
+                self._touchedGuids.add(newEvent.guid)
+                self._sectionGuidsById[scId] = newEvent.guid
+            scIdsBySrcId[srcId] = scId
             self.novel.sections[scId].status = source.sections[srcId].status
 
             #--- Update section type.
@@ -1812,20 +2177,10 @@ class JsonTimeline2(File):
             if source.sections[srcId].time is not None:
                 self.novel.sections[scId].time = source.sections[srcId].time
 
-            #--- Calculate event date from unspecific section date, if any:
-            if source.sections[srcId].day is not None:
-                dayInt = int(source.sections[srcId].day)
-                sectionDelta = timedelta(days=dayInt)
-                self.novel.sections[scId].date = (
-                    self.referenceDate
-                    +sectionDelta
-                ).isoformat().split('T')[0]
-            elif source.sections[srcId].date is None:
-                self.novel.sections[scId].date = (
-                    self.referenceDate.isoformat().split('T')[0]
-                )
-            else:
-                self.novel.sections[scId].date = source.sections[srcId].date
+            #--- Update section date.
+            self.novel.sections[scId].date = self._w_get_date(
+                source.sections[srcId]
+            )
 
             #--- Update section duration.
             if source.sections[srcId].lastsMinutes is None:
@@ -1846,4 +2201,49 @@ class JsonTimeline2(File):
                 self.novel.sections[scId].lastsDays = (
                     source.sections[srcId].lastsDays
                 )
+        return scIdsBySrcId
+
+    def _w_update_sync_map(
+            self,
+            source,
+            scIdsBySrcId,
+            crIdsBySrcId,
+            lcIdsBySrcId,
+            itIdsBySrcId,
+            acIdsBySrcId
+    ):
+        eventGuids = set(event.guid for event in self._events)
+        guidsById = {}
+        for idsBySrcId, guidsByTargetId in (
+            (scIdsBySrcId, self._sectionGuidsById),
+            (crIdsBySrcId, self._characterGuidsById),
+            (lcIdsBySrcId, self._locationGuidsById),
+            (itIdsBySrcId, self._itemGuidsById),
+            (acIdsBySrcId, self._arcGuidsById),
+        ):
+            for srcId, targetId in idsBySrcId.items():
+                guid = guidsByTargetId.get(targetId, None)
+                if guid is not None:
+                    guidsById[srcId] = guid
+        for srcId, guid in list(guidsById.items()):
+            if srcId in scIdsBySrcId and not guid in eventGuids:
+                # The event has been deleted.
+                del guidsById[srcId]
+        self._syncMap.guidsById = guidsById
+        fingerprints = {}
+        for srcId in scIdsBySrcId:
+            guid = guidsById.get(srcId, None)
+            if guid is None:
+                continue
+
+            fingerprint = self._eventFingerprints.get(guid, None)
+            if fingerprint is None:
+                fingerprint = self._w_get_fingerprint(
+                    source.sections[srcId],
+                    guidsById,
+                )
+            fingerprints[guid] = fingerprint
+        self._syncMap.fingerprints = fingerprints
+        self._syncMap.timelineCrc = self._get_timeline_crc()
+        self._syncMap.write()
 
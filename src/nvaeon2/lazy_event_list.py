@@ -0,0 +1,238 @@
+"""Provide a lazy sequence class for Aeon Timeline 2 events.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from json import JSONDecodeError
+import json
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class LazyEventList:
+    """Read-only sequence of the event objects in a timeline.json text.
+
+    On instantiation, only an index of the events' start offsets
+    is built. An event is parsed each time it is accessed, and not kept,
+    so the JSON text is held in memory instead of the event objects.
+    In indented or line-separated JSON text, the index is built by
+    searching the separator with its line break and indentation,
+    which is found only between the events. Otherwise, if NumPy is
+    available, the index is built by a vectorized scan of the text's
+    quotes and brackets. If not, each event is decoded and discarded,
+    to find where the next one starts.
+    """
+    CHUNK_SIZE = 1 << 24
+    # bytes scanned at once by the vectorized scan
+    INDENT = re.compile(r'[ \t]*')
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, text, start, jsonBytes=None):
+        """Build the offset index of a JSON array of objects.
+
+        Positional arguments:
+            text: str -- JSON text containing the array.
+            start: int -- position of the array's opening bracket.
+
+        Optional arguments:
+            jsonBytes: bytes -- the UTF-8 encoded text;
+                                required for the vectorized scan.
+
+        The position after the array's closing bracket
+        is stored in the "end" attribute.
+        Raise the "JSONDecodeError" exception in case of invalid data.
+        """
+        self._text = text
+        self._decoder = json.JSONDecoder()
+        if not text.startswith('[', start):
+            raise JSONDecodeError("Expecting '['", text, start)
+
+        scan = self._scan_by_separator(start)
+        if scan is None:
+            if np is None or jsonBytes is None:
+                scan = self._scan_by_decoding(start)
+            else:
+                scan = self._scan_vectorized(start, jsonBytes)
+        self._offsets, self.end = scan
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._decode(offset) for offset in self._offsets[i]]
+
+        return self._decode(self._offsets[i])
+
+    def __iter__(self):
+        for offset in self._offsets:
+            yield self._decode(offset)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _decode(self, offset):
+        return self._decoder.raw_decode(self._text, offset)[0]
+
+    def _get_char_offsets(self, byteOffsets, data):
+        # Subtract the UTF-8 continuation bytes preceding each byte offset.
+        continuations = np.flatnonzero((data & 0xC0) == 0x80)
+        return byteOffsets - np.searchsorted(continuations, byteOffsets)
+
+    def _scan_by_decoding(self, start):
+        text = self._text
+        pos = self.WHITESPACE.match(text, start + 1).end()
+        offsets = []
+        if text.startswith(']', pos):
+            return offsets, pos + 1
+
+        while True:
+            offsets.append(pos)
+            __, pos = self._decoder.raw_decode(text, pos)
+            pos = self.WHITESPACE.match(text, pos).end()
+            if text.startswith(']', pos):
+                return offsets, pos + 1
+
+            if not text.startswith(',', pos):
+                raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+
+            pos = self.WHITESPACE.match(text, pos + 1).end()
+
+    def _scan_by_separator(self, start):
+        # Return the offsets and the end position, or None if the text
+        # is not indented or line-separated.
+        # JSON strings cannot contain line breaks, so the text between
+        # the first two events, if it contains a line break, separates
+        # only events. The closing bracket is expected on a line
+        # indented like the line with the opening bracket.
+        # Only the first and the last event are decoded.
+        text = self._text
+        pos = self.WHITESPACE.match(text, start + 1).end()
+        if not text.startswith('{', pos):
+            return None
+
+        offsets = [pos]
+        __, pos = self._decoder.raw_decode(text, pos)
+        elementEnd = pos
+        pos = self.WHITESPACE.match(text, pos).end()
+        if text.startswith(']', pos):
+            return offsets, pos + 1
+
+        if not text.startswith(',', pos):
+            raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+
+        pos = self.WHITESPACE.match(text, pos + 1).end()
+        separator = text[elementEnd - 1:pos + 1]
+        if not (separator.endswith('{') and '\n' in separator):
+            return None
+
+        lineStart = text.rfind('\n', 0, start) + 1
+        indent = self.INDENT.match(text, lineStart).group()
+        closing = f'\n{indent}]'
+        arrayEnd = text.find(closing, pos)
+        if arrayEnd == -1:
+            return None
+
+        arrayEnd += len(closing) - 1
+        pos = text.find(separator, elementEnd - 1, arrayEnd)
+        while pos != -1:
+            pos += len(separator) - 1
+            offsets.append(pos)
+            pos = text.find(separator, pos, arrayEnd)
+
+        # Make sure that the closing bracket found belongs to the array.
+        __, pos = self._decoder.raw_decode(text, offsets[-1])
+        pos = self.WHITESPACE.match(text, pos).end()
+        if pos != arrayEnd:
+            return None
+
+        return offsets, pos + 1
+
+    def _scan_vectorized(self, start, jsonBytes):
+        isAscii = len(jsonBytes) == len(self._text)
+        if isAscii:
+            byteStart = start
+        else:
+            byteStart = len(self._text[:start].encode('utf-8'))
+        data = np.frombuffer(jsonBytes, dtype=np.uint8)
+        byteOffsets = []
+        byteEnd = None
+        depth = 0
+        inString = False
+        for chunkStart in range(byteStart, len(data), self.CHUNK_SIZE):
+            chunk = data[chunkStart:chunkStart + self.CHUNK_SIZE]
+
+            #--- Find the quotes delimiting the strings.
+            quotes = np.flatnonzero(chunk == 0x22)
+            escaped = []
+            for i in quotes[
+                data[chunkStart + quotes - 1] == 0x5C
+            ].tolist():
+                # The quote is escaped by an odd number of backslashes.
+                backslashes = 1
+                while jsonBytes[chunkStart + i - backslashes - 1] == 0x5C:
+                    backslashes += 1
+                if backslashes % 2:
+                    escaped.append(i)
+            if escaped:
+                quotes = quotes[~np.isin(quotes, escaped)]
+
+            #--- Find the brackets outside the strings.
+            folded = chunk | 0x20
+            # '[' becomes '{', and ']' becomes '}'
+            opening = np.flatnonzero(folded == 0x7B)
+            closing = np.flatnonzero(folded == 0x7D)
+            quotesBefore = int(inString)
+            opening = opening[
+                (np.searchsorted(quotes, opening) + quotesBefore) % 2 == 0
+            ]
+            closing = closing[
+                (np.searchsorted(quotes, closing) + quotesBefore) % 2 == 0
+            ]
+            inString = (len(quotes) + quotesBefore) % 2 == 1
+
+            #--- Get the nesting depth after each bracket.
+            positions = np.concatenate((opening, closing))
+            steps = np.concatenate((
+                np.ones(len(opening), dtype='int64'),
+                np.full(len(closing), -1, dtype='int64'),
+            ))
+            order = np.argsort(positions, kind='stable')
+            positions = positions[order]
+            steps = steps[order]
+            depths = depth + np.cumsum(steps)
+
+            #--- The array ends where the depth returns to zero;
+            #    its objects start where the depth rises to two.
+            arrayEnds = np.flatnonzero(depths == 0)
+            if arrayEnds.size:
+                last = arrayEnds[0]
+                byteEnd = chunkStart + int(positions[last]) + 1
+            else:
+                last = len(positions)
+            isObjectStart = (steps[:last] == 1) & (depths[:last] == 2)
+            byteOffsets.append(chunkStart + positions[:last][isObjectStart])
+            if byteEnd is not None:
+                break
+
+            if len(depths):
+                depth = int(depths[-1])
+
+        if byteEnd is None:
+            raise JSONDecodeError(
+                "Expecting ',' delimiter",
+                self._text,
+                len(self._text),
+            )
+
+        byteOffsets = np.concatenate(byteOffsets)
+        if isAscii:
+            return byteOffsets.tolist(), byteEnd
+
+        charOffsets = self._get_char_offsets(
+            np.append(byteOffsets, byteEnd),
+            data[:byteEnd],
+        ).tolist()
+        return charOffsets[:-1], charOffsets[-1]
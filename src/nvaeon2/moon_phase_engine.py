@@ -0,0 +1,46 @@
+"""Provide a class for batch computing moon phases.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+
+
+class MoonPhaseEngine:
+    """Moon phase strings computed once per date.
+
+    The distinct dates are collected first, so the costs scale
+    with the number of days, not with the number of events.
+    """
+
+    def __init__(self, nvService):
+        """Initialize instance variables.
+
+        Positional arguments:
+            nvService -- NvService instance providing get_moon_phase_str().
+        """
+        self._nvSvc = nvService
+        self._moonPhases = {}
+        # key: ISO date string or None
+        # value: moon phase string
+
+    def compute_all(self, isoDates):
+        """Compute the moon phases of all distinct dates not yet known.
+
+        Positional arguments:
+            isoDates -- iterable of ISO date strings; None is allowed.
+        """
+        for isoDate in set(isoDates).difference(self._moonPhases):
+            self._moonPhases[isoDate] = self._nvSvc.get_moon_phase_str(isoDate)
+
+    def get_moon_phase_str(self, isoDate):
+        """Return the moon phase string for a date.
+
+        Positional arguments:
+            isoDate: str -- date in ISO format, or None.
+        """
+        moonPhase = self._moonPhases.get(isoDate, None)
+        if moonPhase is None:
+            moonPhase = self._nvSvc.get_moon_phase_str(isoDate)
+            self._moonPhases[isoDate] = moonPhase
+        return moonPhase
@@ -0,0 +1,203 @@
+"""Provide a class for finding overlapping character assignments.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class OverlapChecker:
+    """Interval index of the events per character.
+
+    Find the pairs of overlapping events that share a character,
+    but have no location in common.
+    The events are addressed by their index in the timeline's event list.
+    Events are half-open intervals [start, end), so an event ending
+    when another one starts does not overlap with it.
+    Events without duration count as one second.
+    Events without location are not indexed.
+    If NumPy is available, get_overlaps() searches all characters'
+    intervals at once. Otherwise, it falls back to pure Python.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self._intervals = {}
+        # key: character GUID
+        # value: list of tuples (start, end, event index)
+        self._locationCodes = {}
+        # key: event index
+        # value: code of the event's location set
+        self._locationSets = []
+        # frozensets of location GUIDs, indexed by location set code
+        self._locationSetCodes = {}
+        # key: frozenset of location GUIDs
+        # value: location set code
+        self._disjoint = {}
+        # key: tuple of two location set codes
+        # value: True, if the location sets have no location in common
+
+    def add_event(self, eventIndex, start, end, characterGuids, locationGuids):
+        """Index an event for the characters assigned to it.
+
+        Positional arguments:
+            eventIndex: int -- index of the event in the event list.
+            start -- start timestamp.
+            end -- timestamp after the end of the event.
+            characterGuids -- iterable of the event's character GUIDs.
+            locationGuids -- iterable of the event's location GUIDs.
+        """
+        locationSet = frozenset(locationGuids)
+        if not locationSet:
+            return
+
+        if end <= start:
+            end = start + 1
+        locationCode = self._locationSetCodes.get(locationSet, None)
+        if locationCode is None:
+            locationCode = len(self._locationSets)
+            self._locationSetCodes[locationSet] = locationCode
+            self._locationSets.append(locationSet)
+        self._locationCodes[eventIndex] = locationCode
+        for characterGuid in characterGuids:
+            self._intervals.setdefault(characterGuid, []).append(
+                (start, end, eventIndex)
+            )
+
+    def get_overlaps(self):
+        """Return a list of the conflicting event pairs.
+
+        Each list item is a tuple (character GUID, event index, event index).
+        The pairs are grouped by character in the order of indexing.
+        Within a group, they are sorted by the start of the first event,
+        then by the start of the second event.
+        """
+        if np is None:
+            return self._get_overlaps_by_bisection()
+
+        return self._get_overlaps_vectorized()
+
+    def _get_overlaps_by_bisection(self):
+        overlaps = []
+        for characterGuid, intervals in self._intervals.items():
+            intervals = sorted(intervals, key=lambda interval: interval[0])
+            starts = [interval[0] for interval in intervals]
+            for i, (__, end, eventIndex) in enumerate(intervals):
+                for j in range(i + 1, bisect_left(starts, end, lo=i + 1)):
+                    otherIndex = intervals[j][2]
+                    if self._is_conflict(eventIndex, otherIndex):
+                        overlaps.append(
+                            (characterGuid, eventIndex, otherIndex)
+                        )
+        return overlaps
+
+    def _get_overlaps_vectorized(self):
+        characterGuids = list(self._intervals)
+        intervals = [
+            interval
+            for characterGuid in characterGuids
+            for interval in self._intervals[characterGuid]
+        ]
+        if not intervals:
+            return []
+
+        groups = np.repeat(
+            np.arange(len(characterGuids), dtype='int64'),
+            [len(self._intervals[guid]) for guid in characterGuids],
+        )
+        starts = np.array([interval[0] for interval in intervals])
+        ends = np.array([interval[1] for interval in intervals])
+        eventIndices = np.array(
+            [interval[2] for interval in intervals],
+            dtype='int64',
+        )
+
+        # Replace the timestamps by their ranks, and put each
+        # character's intervals into a key range of its own.
+        # So a single search finds the overlapping intervals
+        # of all characters.
+        timestamps, ranks = np.unique(
+            np.concatenate((starts, ends)),
+            return_inverse=True,
+        )
+        ranks = ranks.reshape(-1).astype('int64')
+        groupOffsets = groups * (len(timestamps) + 1)
+        startKeys = groupOffsets + ranks[:len(intervals)]
+        endKeys = groupOffsets + ranks[len(intervals):]
+        order = np.argsort(startKeys, kind='stable')
+        startKeys = startKeys[order]
+        endKeys = endKeys[order]
+        groups = groups[order]
+        eventIndices = eventIndices[order]
+
+        # Each interval overlaps with the following intervals
+        # that start before its end.
+        positions = np.arange(len(intervals), dtype='int64')
+        counts = (
+            np.searchsorted(startKeys, endKeys, side='left')
+            -positions - 1
+        )
+        firsts = np.repeat(positions, counts)
+        seconds = (
+            firsts + 1
+            +np.arange(len(firsts), dtype='int64')
+            -np.repeat(np.cumsum(counts) - counts, counts)
+        )
+
+        # Keep the pairs without common location.
+        locationCodes = np.full(
+            max(self._locationCodes) + 1,
+            -1,
+            dtype='int64',
+        )
+        locationCodes[list(self._locationCodes)] = list(
+            self._locationCodes.values()
+        )
+        firstCodes = locationCodes[eventIndices[firsts]]
+        secondCodes = locationCodes[eventIndices[seconds]]
+        candidates = np.nonzero(firstCodes != secondCodes)[0]
+        multiple = np.array(
+            [len(locationSet) > 1 for locationSet in self._locationSets],
+            dtype=bool,
+        )
+        isConflict = ~(
+            multiple[firstCodes[candidates]]
+            | multiple[secondCodes[candidates]]
+        )
+        for k in np.nonzero(~isConflict)[0]:
+            isConflict[k] = self._is_disjoint(
+                int(firstCodes[candidates[k]]),
+                int(secondCodes[candidates[k]]),
+            )
+        candidates = candidates[isConflict]
+        return [
+            (characterGuids[group], firstIndex, secondIndex)
+            for group, firstIndex, secondIndex in zip(
+                groups[firsts[candidates]].tolist(),
+                eventIndices[firsts[candidates]].tolist(),
+                eventIndices[seconds[candidates]].tolist(),
+            )
+        ]
+
+    def _is_conflict(self, eventIndex, otherIndex):
+        firstCode = self._locationCodes[eventIndex]
+        secondCode = self._locationCodes[otherIndex]
+        if firstCode == secondCode:
+            return False
+
+        return self._is_disjoint(firstCode, secondCode)
+
+    def _is_disjoint(self, firstCode, secondCode):
+        disjoint = self._disjoint.get((firstCode, secondCode), None)
+        if disjoint is None:
+            disjoint = self._locationSets[firstCode].isdisjoint(
+                self._locationSets[secondCode]
+            )
+            self._disjoint[(firstCode, secondCode)] = disjoint
+        return disjoint
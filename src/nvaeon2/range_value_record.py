@@ -0,0 +1,128 @@
+"""Provide a compact record class for Aeon Timeline 2 event range values.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import sys
+
+
+class RangeValueRecord:
+    """Compact representation of an event's range value.
+
+    The position's precision and timestamp are flattened into the record.
+    The range property GUID is interned.
+    Members unknown to the record are kept, and the JSON member order
+    is restored on conversion.
+    """
+    FIELDS = frozenset((
+        'minimumZoom',
+        'rangeProperty',
+        'span',
+    ))
+    POSITION_FIELDS = frozenset((
+        'precision',
+        'timestamp',
+    ))
+    __slots__ = (
+        'minimumZoom',
+        'rangeProperty',
+        'span',
+        'precision',
+        'timestamp',
+        '_keys',
+        '_positionKeys',
+        '_other',
+    )
+    STANDARD_KEYS = (
+        'minimumZoom',
+        'position',
+        'rangeProperty',
+        'span',
+    )
+    STANDARD_POSITION_KEYS = (
+        'precision',
+        'timestamp',
+    )
+    # Members of the range values written by Aeon Timeline 2,
+    # in their order.
+    _keyOrders = {
+        STANDARD_KEYS: STANDARD_KEYS,
+        STANDARD_POSITION_KEYS: STANDARD_POSITION_KEYS,
+    }
+    # Shared tuples of JSON member names.
+
+    def __init__(self, jsonRangeValue):
+        """Materialize the record from a JSON range value.
+
+        Positional arguments:
+            jsonRangeValue: dict -- range value decoded from timeline.json.
+        """
+        self._keys = self._get_key_order(jsonRangeValue)
+        self.minimumZoom = jsonRangeValue.get('minimumZoom', None)
+        self.rangeProperty = jsonRangeValue.get('rangeProperty', None)
+        if isinstance(self.rangeProperty, str):
+            self.rangeProperty = sys.intern(self.rangeProperty)
+        self.span = jsonRangeValue.get('span', None)
+        position = jsonRangeValue.get('position', None)
+        if position is None:
+            position = {}
+        self._positionKeys = self._get_key_order(position)
+        self.precision = position.get('precision', None)
+        self.timestamp = position.get('timestamp', None)
+        self._other = None
+        if (
+            self._keys is self.STANDARD_KEYS
+            and self._positionKeys is self.STANDARD_POSITION_KEYS
+        ):
+            return
+
+        other = {}
+        for key in self._keys:
+            if not key in self.FIELDS and key != 'position':
+                other[key] = jsonRangeValue[key]
+        for key in self._positionKeys:
+            if not key in self.POSITION_FIELDS:
+                other[('position', key)] = position[key]
+        self._other = other or None
+
+    def to_json(self):
+        """Return the range value as a JSON-serializable dictionary."""
+        if (
+            self._keys is self.STANDARD_KEYS
+            and self._positionKeys is self.STANDARD_POSITION_KEYS
+        ):
+            return {
+                'minimumZoom': self.minimumZoom,
+                'position': {
+                    'precision': self.precision,
+                    'timestamp': self.timestamp,
+                },
+                'rangeProperty': self.rangeProperty,
+                'span': self.span,
+            }
+
+        jsonRangeValue = {}
+        for key in self._keys:
+            if key == 'position':
+                jsonRangeValue[key] = self._get_json_position()
+            elif key in self.FIELDS:
+                jsonRangeValue[key] = getattr(self, key)
+            else:
+                jsonRangeValue[key] = self._other[key]
+        return jsonRangeValue
+
+    def _get_json_position(self):
+        position = {}
+        for key in self._positionKeys:
+            if key == 'precision':
+                position[key] = self.precision
+            elif key == 'timestamp':
+                position[key] = self.timestamp
+            else:
+                position[key] = self._other[('position', key)]
+        return position
+
+    def _get_key_order(self, jsonObject):
+        keys = tuple(jsonObject)
+        return self._keyOrders.setdefault(keys, keys)
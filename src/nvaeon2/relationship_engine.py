@@ -0,0 +1,104 @@
+"""Provide a class for classifying Aeon Timeline 2 event relationships.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+
+
+class RelationshipEngine:
+    """Role-dispatching classifier for event relationships.
+
+    The role GUIDs of the template are interned into small integer
+    role codes once per timeline. Each event's relationships are then
+    sorted by role in one single pass, using the role codes as an index.
+    """
+    CHARACTER = 0
+    LOCATION = 1
+    ITEM = 2
+    PLOTLINE = 3
+    ARC = 4
+    ROLE_COUNT = 5
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self._roleCodes = {}
+        # key: role GUID
+        # value: role code
+        self._narrativeGuid = None
+
+    def classify(self, relationships):
+        """Sort an event's relationships by role.
+
+        Positional arguments:
+            relationships -- list of the event's relationship tuples
+                             (role GUID, entity GUID, percentAllocated).
+
+        Return a tuple (isNarrative, entityGuids, otherRelationships):
+            isNarrative: bool -- True, if the event is related
+                                 to the "Narrative" arc.
+            entityGuids -- tuple of entity GUID lists, indexed by role code.
+            otherRelationships -- list of the relationships
+                                  with roles not managed by novelibre.
+        """
+        entityGuids = tuple([] for __ in range(self.ROLE_COUNT))
+        otherRelationships = []
+        for evtRel in relationships:
+            roleCode = self._roleCodes.get(evtRel[0], None)
+            if roleCode is None:
+                otherRelationships.append(evtRel)
+            else:
+                entityGuids[roleCode].append(evtRel[1])
+        isNarrative = self._narrativeGuid in entityGuids[self.ARC]
+        return isNarrative, entityGuids, otherRelationships
+
+    def get_entity_guids(self, relationships, roleCode):
+        """Return a list of the entity GUIDs related with a role.
+
+        Positional arguments:
+            relationships -- list of the event's relationship tuples
+                             (role GUID, entity GUID, percentAllocated).
+            roleCode: int -- role code, e.g. CHARACTER.
+        """
+        roleCodes = self._roleCodes
+        return [
+            evtRel[1] for evtRel in relationships
+            if roleCodes.get(evtRel[0], None) == roleCode
+        ]
+
+    def is_narrative(self, relationships):
+        """Return True, if the event is related to the "Narrative" arc.
+
+        Positional arguments:
+            relationships -- list of the event's relationship tuples
+                             (role GUID, entity GUID, percentAllocated).
+        """
+        for evtRel in relationships:
+            if (
+                evtRel[1] == self._narrativeGuid
+                and self._roleCodes.get(evtRel[0], None) == self.ARC
+            ):
+                return True
+
+        return False
+
+    def set_roles(self, templateIndex, narrativeGuid):
+        """Build the role dispatch table.
+
+        Positional arguments:
+            templateIndex -- TemplateIndex instance with the role GUIDs.
+            narrativeGuid: str -- GUID of the "Narrative" arc entity.
+        """
+        self._narrativeGuid = narrativeGuid
+        self._roleCodes = {}
+        # Roles listed first are overridden by roles listed later,
+        # if the template uses the same role for different purposes.
+        for roleGuid, roleCode in (
+            (templateIndex.rolePlotlineGuid, self.PLOTLINE),
+            (templateIndex.roleItemGuid, self.ITEM),
+            (templateIndex.roleLocationGuid, self.LOCATION),
+            (templateIndex.roleCharacterGuid, self.CHARACTER),
+            (templateIndex.roleArcGuid, self.ARC),
+        ):
+            if roleGuid is not None:
+                self._roleCodes[roleGuid] = roleCode
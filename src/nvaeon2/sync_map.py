@@ -0,0 +1,87 @@
+"""Provide a class for mapping novelibre IDs to Aeon Timeline 2 GUIDs.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import json
+import os
+
+
+class SyncMap:
+    """Persistent mapping of novelibre element IDs to Aeon Timeline 2 GUIDs.
+
+    The map is stored in a JSON file next to the timeline.
+    It identifies the elements renamed on either side since the last sync.
+    Besides, it holds a fingerprint of each event's section data and the
+    CRC of the timeline written by the last sync, so unchanged events
+    can be skipped.
+    """
+    EXTENSION = '.aeonmap'
+
+    def __init__(self, timelinePath):
+        """Initialize instance variables.
+
+        Positional arguments:
+            timelinePath: str -- path of the .aeonzip file.
+        """
+        self.filePath = (
+            f'{os.path.splitext(timelinePath)[0]}{self.EXTENSION}'
+        )
+        self.guidsById = {}
+        # key: novelibre element ID
+        # value: Aeon Timeline 2 GUID
+        self.fingerprints = {}
+        # key: event GUID
+        # value: fingerprint of the section data written to the event
+        self.timelineCrc = None
+        # CRC of the 'timeline.json' member written by the last sync
+        self._storedData = None
+
+    def get_ids_by_guid(self):
+        """Return a dictionary with the element IDs by GUID."""
+        return {guid: elemId for elemId, guid in self.guidsById.items()}
+
+    def read(self):
+        """Read the map from the file.
+
+        Start with an empty map if the file is missing or invalid.
+        """
+        try:
+            with open(self.filePath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.guidsById = dict(data['guidsById'])
+            self.fingerprints = dict(data['fingerprints'])
+            self.timelineCrc = data['timelineCrc']
+        except (OSError, ValueError, KeyError, TypeError):
+            self.guidsById = {}
+            self.fingerprints = {}
+            self.timelineCrc = None
+        self._storedData = self._get_data()
+
+    def write(self):
+        """Write the map to the file, if it has changed.
+
+        The map is not essential for the conversion,
+        so errors are ignored.
+        """
+        data = self._get_data()
+        if data == self._storedData:
+            return
+
+        tmpPath = f'{self.filePath}.tmp'
+        try:
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=0, sort_keys=True)
+            os.replace(tmpPath, self.filePath)
+        except OSError:
+            return
+
+        self._storedData = data
+
+    def _get_data(self):
+        return {
+            'guidsById': dict(self.guidsById),
+            'fingerprints': dict(self.fingerprints),
+            'timelineCrc': self.timelineCrc,
+        }
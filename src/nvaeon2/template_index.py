@@ -0,0 +1,346 @@
+"""Provide a class for resolving Aeon Timeline 2 template GUIDs.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from nvaeon2.nvaeon2_locale import _
+
+
+class TemplateIndex:
+    """Lookup table for the GUIDs of the user-defined template elements.
+
+    The template's colors, range properties, types, roles, and properties
+    are resolved in one single pass. Missing types, roles, and properties
+    are added in one batch.
+    """
+    GUID_ATTRIBUTES = (
+        'dateGuid',
+        'typeArcGuid',
+        'typeCharacterGuid',
+        'typeLocationGuid',
+        'typeItemGuid',
+        'roleArcGuid',
+        'rolePlotlineGuid',
+        'roleCharacterGuid',
+        'roleLocationGuid',
+        'roleItemGuid',
+        'propertyDescGuid',
+        'propertyNotesGuid',
+        'propertyMoonphaseGuid',
+    )
+
+    def __init__(self, **kwargs):
+        """Initialize instance variables.
+
+        Required keyword arguments:
+            property_description: str -- name of the user-defined section
+                                         description property.
+            property_notes: str -- name of the user-defined
+                                   section notes property.
+            property_moonphase: str -- name of the user-defined
+                                       moon phase property.
+            role_arc: str -- name of the user-defined role for arcs.
+            role_plotline: str -- name of the user-defined role
+                                  for plot lines.
+            role_location: str -- name of the user-defined role
+                                  for section locations.
+            role_item: str -- name of the user-defined role for items
+                              in a section.
+            role_character: str -- name of the user-defined role for characters
+                                   in a section.
+            type_arc: str -- name of the user-defined "Arc" type.
+            type_character: str -- name of the user-defined "Character" type.
+            type_location: str -- name of the user-defined "Location" type.
+            type_item: str -- name of the user-defined "Item" type.
+        """
+        # JSON[template][properties][name]
+        self._propertyDesc = kwargs['property_description']
+        self._propertyNotes = kwargs['property_notes']
+        self._propertyMoonphase = kwargs['property_moonphase']
+
+        # JSON[template][types][name][roles]
+        self._roleArc = kwargs['role_arc']
+        self._rolePlotline = kwargs['role_plotline']
+        self._roleCharacter = kwargs['role_character']
+        self._roleLocation = kwargs['role_location']
+        self._roleItem = kwargs['role_item']
+
+        # JSON[template][types][name]
+        self._typeArc = kwargs['type_arc']
+        self._typeCharacter = kwargs['type_character']
+        self._typeLocation = kwargs['type_location']
+        self._typeItem = kwargs['type_item']
+
+        # GUIDs
+        self.colors = {}
+        for attribute in self.GUID_ATTRIBUTES:
+            setattr(self, attribute, None)
+
+    def add_moonphase_property(self, template, guidGen):
+        """Add the moon phase property to the template, if missing.
+
+        Positional arguments:
+            template -- JSON template structure.
+            guidGen -- GuidGenerator instance for the new GUID.
+        """
+        if self.propertyMoonphaseGuid is not None:
+            return
+
+        tplProperties = template['properties']
+        self.propertyMoonphaseGuid = guidGen.get_guid(
+            '_propertyMoonphaseGuid'
+        )
+        tplProperties.append(
+            {
+                'calcMode':'default',
+                'calculate':False,
+                'fadeEvents':False,
+                'guid':self.propertyMoonphaseGuid,
+                'icon':'flag',
+                'isMandatory':False,
+                'name':self._propertyMoonphase,
+                'sortOrder':len(tplProperties),
+                'type':'text'
+            }
+        )
+
+    def complete(self, template, guidGen, addMoonphase):
+        """Add missing types, roles, and properties to the template.
+
+        Positional arguments:
+            template -- JSON template structure.
+            guidGen -- GuidGenerator instance for the new GUIDs.
+            addMoonphase: bool -- if True, add a moon phase property.
+        """
+        tplTypes = template['types']
+        tplProperties = template['properties']
+
+        #--- Add missing types.
+        if self.typeCharacterGuid is None:
+            self.typeCharacterGuid = guidGen.get_guid('_typeCharacterGuid')
+            self.roleCharacterGuid = guidGen.get_guid('_roleCharacterGuid')
+            tplTypes.append(
+                {
+                    'color':'iconRed',
+                    'guid':self.typeCharacterGuid,
+                    'icon':'person',
+                    'name':self._typeCharacter,
+                    'persistent':False,
+                    'roles':[],
+                    'sortOrder':len(tplTypes)
+                }
+            )
+        if self.typeLocationGuid is None:
+            self.typeLocationGuid = guidGen.get_guid('_typeLocationGuid')
+            self.roleLocationGuid = guidGen.get_guid('_roleLocationGuid')
+            tplTypes.append(
+                {
+                    'color':'iconOrange',
+                    'guid':self.typeLocationGuid,
+                    'icon':'map',
+                    'name':self._typeLocation,
+                    'persistent':True,
+                    'roles':[],
+                    'sortOrder':len(tplTypes)
+                }
+            )
+        if self.typeItemGuid is None:
+            self.typeItemGuid = guidGen.get_guid('_typeItemGuid')
+            self.roleItemGuid = guidGen.get_guid('_roleItemGuid')
+            tplTypes.append(
+                {
+                    'color':'iconPurple',
+                    'guid':self.typeItemGuid,
+                    'icon':'cube',
+                    'name':self._typeItem,
+                    'persistent':True,
+                    'roles':[],
+                    'sortOrder':len(tplTypes)
+                }
+            )
+        if self.typeArcGuid is None:
+            self.typeArcGuid = guidGen.get_guid('typeArcGuid')
+            tplTypes.append(
+                {
+                    'color':'iconYellow',
+                    'guid':self.typeArcGuid,
+                    'icon':'book',
+                    'name':self._typeArc,
+                    'persistent':True,
+                    'roles':[],
+                    'sortOrder':len(tplTypes)
+                }
+            )
+
+        #--- Add missing roles.
+        tplTypesByName = {}
+        for tplTyp in tplTypes:
+            if not tplTyp['name'] in tplTypesByName:
+                tplTypesByName[tplTyp['name']] = tplTyp
+        for roleAttribute, typeName, roleName, fragment, icon in (
+            (
+                'roleArcGuid',
+                self._typeArc,
+                self._roleArc,
+                '_roleArcGuid',
+                'circle text',
+            ),
+            (
+                'roleCharacterGuid',
+                self._typeCharacter,
+                self._roleCharacter,
+                '_roleCharacterGuid',
+                'circle text',
+            ),
+            (
+                'roleLocationGuid',
+                self._typeLocation,
+                self._roleLocation,
+                '_roleLocationGuid',
+                'circle text',
+            ),
+            (
+                'roleItemGuid',
+                self._typeItem,
+                self._roleItem,
+                '_roleItemGuid',
+                'circle text',
+            ),
+            (
+                'rolePlotlineGuid',
+                self._typeArc,
+                self._rolePlotline,
+                '_roleStorylineGuid',
+                'circle filled text',
+            ),
+        ):
+            if getattr(self, roleAttribute) is not None:
+                continue
+
+            if not typeName in tplTypesByName:
+                continue
+
+            roleGuid = guidGen.get_guid(fragment)
+            setattr(self, roleAttribute, roleGuid)
+            tplTypesByName[typeName]['roles'].append(
+                {
+                    'allowsMultipleForEntity':True,
+                    'allowsMultipleForEvent':True,
+                    'allowsPercentAllocated':False,
+                    'guid':roleGuid,
+                    'icon':icon,
+                    'mandatoryForEntity':False,
+                    'mandatoryForEvent':False,
+                    'name':roleName,
+                    'sortOrder':0
+                }
+            )
+
+        #--- Add missing properties.
+        if self.propertyNotesGuid is None:
+            for tplPrp in tplProperties:
+                tplPrp['sortOrder'] += 1
+            self.propertyNotesGuid = guidGen.get_guid('_propertyNotesGuid')
+            tplProperties.insert(
+                0,
+                {
+                    'calcMode':'default',
+                    'calculate':False,
+                    'fadeEvents':False,
+                    'guid':self.propertyNotesGuid,
+                    'icon':'tag',
+                    'isMandatory':False,
+                    'name':self._propertyNotes,
+                    'sortOrder':0,
+                    'type':'multitext'
+                }
+            )
+        if self.propertyDescGuid is None:
+            self.propertyDescGuid = guidGen.get_guid('_propertyDescGuid')
+            tplProperties.append(
+                {
+                    'calcMode':'default',
+                    'calculate':False,
+                    'fadeEvents':False,
+                    'guid':self.propertyDescGuid,
+                    'icon':'tag',
+                    'isMandatory':False,
+                    'name':self._propertyDesc,
+                    'sortOrder':len(tplProperties),
+                    'type':'multitext'
+                }
+            )
+        if addMoonphase:
+            self.add_moonphase_property(template, guidGen)
+
+    def read(self, template):
+        """Resolve the configured names to the template's GUIDs.
+
+        Positional arguments:
+            template -- JSON template structure.
+
+        Raise the "RuntimeError" exception if the calendar has no "AD" era.
+        """
+        self._scan(template)
+        if self.dateGuid is None:
+            raise RuntimeError(_('"AD" era is missing in the calendar.'))
+
+    def _scan(self, template):
+        self.colors = {}
+        for attribute in self.GUID_ATTRIBUTES:
+            setattr(self, attribute, None)
+
+        for tplCol in template['colors']:
+            self.colors[tplCol['name']] = tplCol['guid']
+
+        for tplRgp in template['rangeProperties']:
+            if tplRgp['type'] == 'date':
+                for tplRgpCalEra in tplRgp['calendar']['eras']:
+                    if tplRgpCalEra['name'] == 'AD':
+                        self.dateGuid = tplRgp['guid']
+                        break
+
+        for tplTyp in template['types']:
+            if tplTyp['name'] == self._typeArc:
+                self.typeArcGuid = tplTyp['guid']
+                for tplTypRol in tplTyp['roles']:
+                    if tplTypRol['name'] == self._roleArc:
+                        self.roleArcGuid = tplTypRol['guid']
+                    elif tplTypRol['name'] == self._rolePlotline:
+                        self.rolePlotlineGuid = tplTypRol['guid']
+            if tplTyp['name'] == self._typeCharacter:
+                self.typeCharacterGuid = tplTyp['guid']
+                for tplTypRol in tplTyp['roles']:
+                    if tplTypRol['name'] == self._roleCharacter:
+                        self.roleCharacterGuid = tplTypRol['guid']
+                        break
+            if tplTyp['name'] == self._typeLocation:
+                self.typeLocationGuid = tplTyp['guid']
+                for tplTypRol in tplTyp['roles']:
+                    if tplTypRol['name'] == self._roleLocation:
+                        self.roleLocationGuid = tplTypRol['guid']
+                        break
+            if tplTyp['name'] == self._typeItem:
+                self.typeItemGuid = tplTyp['guid']
+                for tplTypRol in tplTyp['roles']:
+                    if tplTypRol['name'] == self._roleItem:
+                        self.roleItemGuid = tplTypRol['guid']
+                        break
+
+        for tplPrp in template['properties']:
+            if (
+                tplPrp['name'] == self._propertyDesc
+                and self.propertyDescGuid is None
+            ):
+                self.propertyDescGuid = tplPrp['guid']
+            if (
+                tplPrp['name'] == self._propertyNotes
+                and self.propertyNotesGuid is None
+            ):
+                self.propertyNotesGuid = tplPrp['guid']
+            if (
+                tplPrp['name'] == self._propertyMoonphase
+                and self.propertyMoonphaseGuid is None
+            ):
+                self.propertyMoonphaseGuid = tplPrp['guid']
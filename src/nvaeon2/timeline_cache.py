@@ -0,0 +1,129 @@
+"""Provide a cache class for parsed Aeon Timeline 2 JSON data.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from collections import OrderedDict
+import marshal
+import os
+import zipfile
+
+from nvaeon2.aeon2_fop import open_timeline
+from nvaeon2.nvaeon2_locale import _
+
+
+class TimelineCache:
+    """Bounded LRU cache of parsed timeline.json data.
+
+    The entries are keyed on the file's path, modification time, and size.
+    Optionally, the CRC of the 'timeline.json' member is included.
+    The cached data is kept as a marshal snapshot, so each caller
+    gets its own deep copy that can be modified freely.
+    Only the latest snapshot of each file is kept, and the snapshots
+    together take up no more than a given number of bytes.
+    Timelines whose JSON text exceeds this limit are not cached.
+    """
+
+    def __init__(self, maxEntries=4, maxBytes=1 << 26, checkContent=False):
+        """Initialize instance variables.
+
+        Optional arguments:
+            maxEntries: int -- maximum number of cached timelines.
+            maxBytes: int -- maximum total size of the snapshots.
+            checkContent: bool -- if True, include the CRC of the
+                                  'timeline.json' member in the key.
+        """
+        self._maxEntries = maxEntries
+        self._maxBytes = maxBytes
+        self._checkContent = checkContent
+        self._entries = OrderedDict()
+        # key: normalized file path
+        # value: tuple (file key, marshal snapshot)
+        self._size = 0
+        # total size of the snapshots
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+        self._size = 0
+
+    def open_timeline(self, filePath):
+        """Return a copy of the timeline structure read from filePath.
+
+        Positional arguments:
+            filePath -- Path of the .aeon project file to read.
+
+        Parse the file only if it has changed since it was cached.
+        Raise the "RuntimeError" exception in case of error.
+        """
+        path = self._normalize(filePath)
+        fileKey = self._get_file_key(filePath)
+        entry = self._entries.get(path, None)
+        if entry is not None and entry[0] == fileKey:
+            self._entries.move_to_end(path)
+            return marshal.loads(entry[1])
+
+        jsonData = open_timeline(filePath)
+        self._put(path, fileKey, jsonData, filePath)
+        return jsonData
+
+    def store(self, filePath, jsonData):
+        """Cache the timeline structure just written to filePath.
+
+        Positional arguments:
+            filePath -- Path of the .aeon project file.
+            jsonData -- Python object containing the timeline structure.
+        """
+        try:
+            fileKey = self._get_file_key(filePath)
+        except RuntimeError:
+            return
+
+        self._put(self._normalize(filePath), fileKey, jsonData, filePath)
+
+    def _get_file_key(self, filePath):
+        try:
+            status = os.stat(filePath)
+            fileKey = (status.st_mtime_ns, status.st_size)
+            if self._checkContent:
+                with zipfile.ZipFile(filePath, 'r') as myzip:
+                    fileKey += (myzip.getinfo('timeline.json').CRC,)
+        except:
+            raise RuntimeError(f'{_("Cannot read timeline data")}.')
+        return fileKey
+
+    def _fits(self, filePath):
+        # Return True if the JSON text is within the size limit.
+        # The snapshot is usually smaller than the JSON text,
+        # so large timelines are not serialized in vain.
+        try:
+            with zipfile.ZipFile(filePath, 'r') as myzip:
+                jsonSize = myzip.getinfo('timeline.json').file_size
+        except:
+            return False
+
+        return jsonSize <= self._maxBytes
+
+    def _normalize(self, filePath):
+        return os.path.normcase(os.path.abspath(filePath))
+
+    def _put(self, path, fileKey, jsonData, filePath):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+        if not self._fits(filePath):
+            return
+
+        snapshot = marshal.dumps(jsonData)
+        if len(snapshot) > self._maxBytes:
+            return
+
+        self._entries[path] = (fileKey, snapshot)
+        self._size += len(snapshot)
+        while (
+            len(self._entries) > self._maxEntries
+            or self._size > self._maxBytes
+        ):
+            __, (__, oldSnapshot) = self._entries.popitem(last=False)
+            self._size -= len(oldSnapshot)
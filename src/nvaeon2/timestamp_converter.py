@@ -0,0 +1,114 @@
+"""Provide a class for converting Aeon Timeline 2 timestamps.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from datetime import datetime
+from datetime import timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TimestampConverter:
+    """Memoizing converter between timestamps and date/time values.
+
+    Aeon Timeline 2 timestamps are seconds since 0001-01-01 00:00:00.
+    Results are cached, so repeated timestamps and ISO strings
+    are converted only once.
+    If NumPy is available, convert_all() converts a whole batch of
+    timestamps at once. Otherwise, it falls back to pure Python.
+    """
+    MAX_TIMESTAMP = int(
+        (datetime(9999, 12, 31, 23, 59, 59) - datetime.min).total_seconds()
+    )
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self._datetimes = {}
+        # key: timestamp
+        # value: datetime object
+        self._isoDateTimes = {}
+        # key: timestamp
+        # value: tuple (ISO date string, ISO time string)
+        self._timestamps = {}
+        # key: ISO date/time string
+        # value: timestamp integer
+
+    def convert_all(self, timestamps):
+        """Convert a batch of timestamps in advance.
+
+        Positional arguments:
+            timestamps -- iterable of timestamps.
+
+        Use vectorized NumPy datetime64 arithmetic, if available.
+        Timestamps that are not integers within the datetime range
+        are left for conversion on demand.
+        """
+        newTimestamps = [
+            timestamp for timestamp in set(timestamps)
+            if not timestamp in self._datetimes
+            and type(timestamp) is int
+            and 0 <= timestamp <= self.MAX_TIMESTAMP
+        ]
+        if not newTimestamps:
+            return
+
+        if np is None:
+            for timestamp in newTimestamps:
+                self.get_datetime(timestamp)
+            return
+
+        seconds = np.array(newTimestamps, dtype='int64')
+        dates = (
+            np.datetime64('0001-01-01T00:00:00', 's')
+            +seconds.astype('timedelta64[s]')
+        ).astype(object)
+        self._datetimes.update(zip(newTimestamps, dates))
+
+    def get_datetime(self, timestamp):
+        """Return a datetime object for a timestamp.
+
+        Positional arguments:
+            timestamp -- seconds since 0001-01-01 00:00:00.
+        """
+        dt = self._datetimes.get(timestamp, None)
+        if dt is None:
+            dt = datetime.min + timedelta(seconds=timestamp)
+            self._datetimes[timestamp] = dt
+        return dt
+
+    def get_iso_date_time(self, timestamp):
+        """Return a tuple of ISO date and time strings for a timestamp.
+
+        Positional arguments:
+            timestamp -- seconds since 0001-01-01 00:00:00.
+        """
+        isoDateTime = self._isoDateTimes.get(timestamp, None)
+        if isoDateTime is None:
+            isoDateTime = tuple(
+                self.get_datetime(timestamp).isoformat().split('T')
+            )
+            self._isoDateTimes[timestamp] = isoDateTime
+        return isoDateTime
+
+    def get_timestamp(self, isoDateTime):
+        """Return a timestamp integer for an ISO date/time string.
+
+        Positional arguments:
+            isoDateTime: str -- date or date/time in ISO format.
+
+        Raise the "ValueError" exception, if isoDateTime is not valid.
+        """
+        timestamp = self._timestamps.get(isoDateTime, None)
+        if timestamp is None:
+            timestamp = int(
+                (
+                    datetime.fromisoformat(isoDateTime) - datetime.min
+                ).total_seconds()
+            )
+            self._timestamps[isoDateTime] = timestamp
+        return timestamp
@@ -9,6 +9,7 @@ import os
 from nvaeon2.json_timeline2 import JsonTimeline2
 from nvaeon2.json_timeline2 import NarrativeMissing
 from nvaeon2.nvaeon2_locale import _
+from nvaeon2.sync_map import SyncMap
 from nvlib.controller.services.nv_service import NvService
 from nvlib.model.converter.converter import Converter
 from nvlib.novx_globals import norm_path
@@ -35,6 +36,8 @@ class Aeon2Converter(Converter):
             return
 
         fileName, fileExtension = os.path.splitext(sourcePath)
+        self.newFile = None
+        kwargs['sync_map'] = SyncMap(f'{fileName}{JsonTimeline2.EXTENSION}')
         if fileExtension == JsonTimeline2.EXTENSION:
             # Source is a timeline
             sourceFile = JsonTimeline2(sourcePath, **kwargs)
@@ -54,6 +57,9 @@ class Aeon2Converter(Converter):
                     **kwargs
                 )
                 self._create_novx(sourceFile, targetFile)
+            if self.newFile is not None:
+                # The novelibre project is written, so the IDs are persistent.
+                sourceFile.update_sync_map()
         elif fileExtension == nvService.get_novx_file_extension():
             # Update existing timeline from novelibre project
             sourceFile = nvService.new_novx_file(sourcePath, **kwargs)
@@ -111,7 +117,17 @@ class Aeon2Converter(Converter):
             statusMsg = f'!{str(ex)}'
             self.newFile = None
         else:
-            statusMsg = f'{_("File written")}: "{norm_path(target.filePath)}".'
+            if target.upToDate:
+                statusMsg = (
+                    f'{_("File is already up to date")}: '
+                    f'"{norm_path(target.filePath)}".'
+                )
+            else:
+                statusMsg = (
+                    f'{_("File written")}: '
+                    f'"{norm_path(target.filePath)}" '
+                    f'({_("Changed events")}: {target.touchedEvents}).'
+                )
             self.newFile = target.filePath
         finally:
             self.ui.set_status(statusMsg)
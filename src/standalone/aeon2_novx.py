@@ -36,11 +36,14 @@ SETTINGS = dict(
     role_location='Location',
     color_section='Red',
     color_event='Yellow',
+    compression_level='6',
 
 )
 OPTIONS = dict(
     add_moonphase=False,
     lock_on_export=False,
+    compress_timeline=True,
+    show_event_count=False,
 )
 
 
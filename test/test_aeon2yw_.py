@@ -6,17 +6,37 @@ For further information see https://github.com/peter88213/aeon2yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import codecs
+from datetime import datetime
+from datetime import timedelta
+from io import BytesIO
 from io import StringIO
 from json import JSONDecodeError
 import json
 import os
+import random
 from shutil import copyfile
 import sys
 import unittest
 import zipfile
 
 from standalone.aeon2_converter import Aeon2Converter
+from nvaeon2.aeon2_fop import open_timeline_lazy
+from nvaeon2.aeon2_fop import save_timeline
+from nvaeon2.event_record import EventRecord
+from nvaeon2.event_store import EventStore
+from nvaeon2.json_stream_reader import JsonStreamReader
+from nvaeon2.json_timeline2 import JsonTimeline2
+from nvaeon2 import lazy_event_list
+from nvaeon2.lazy_event_list import LazyEventList
+from nvaeon2.nvaeon2_locale import _
+from nvaeon2 import overlap_checker
+from nvaeon2.overlap_checker import OverlapChecker
+from nvaeon2 import timestamp_converter
+from nvaeon2.timestamp_converter import TimestampConverter
 from nvlib.configuration.configuration import Configuration
+from nvlib.controller.services.nv_service import NvService
+from nvlib.novx_globals import CH_ROOT
+from nvlib.novx_globals import norm_path
 from nvlib.alternative_ui.ui import Ui
 
 UPDATE = False
@@ -44,11 +64,14 @@ SETTINGS = dict(
     role_location='Location',
     color_section='Red',
     color_event='Yellow',
+    compression_level='6',
 
 )
 OPTIONS = dict(
     add_moonphase=False,
     lock_on_export=False,
+    compress_timeline=True,
+    show_event_count=False,
 )
 
 # Test data
@@ -57,6 +80,7 @@ TEST_NOVX = TEST_EXEC_PATH + 'yw7 Sample Project.novx'
 TEST_NOVX_BAK = TEST_EXEC_PATH + 'yw7 Sample Project.novx.bak'
 TEST_AEON = TEST_EXEC_PATH + 'yw7 Sample Project.aeonzip'
 TEST_AEON_BAK = TEST_EXEC_PATH + 'yw7 Sample Project.aeonzip.bak'
+TEST_AEONMAP = TEST_EXEC_PATH + 'yw7 Sample Project.aeonmap'
 
 
 def convert(sourcePath, installDir='.'):
@@ -80,6 +104,7 @@ def convert(sourcePath, installDir='.'):
 
     # Write error message, if any.
     sys.stderr.write(converter.ui.infoHowText)
+    return converter
 
 
 def open_timeline(filePath):
@@ -119,6 +144,10 @@ def remove_all_testfiles():
         os.remove(TEST_AEON)
     except:
         pass
+    try:
+        os.remove(TEST_AEONMAP)
+    except:
+        pass
     try:
         os.remove(INI_FILE)
     except:
@@ -158,6 +187,19 @@ class NormalOperation(unittest.TestCase):
             copyfile(TEST_NOVX, TEST_DATA_PATH + 'date_limits.novx')
         self.assertEqual(read_file(TEST_NOVX), read_file(TEST_DATA_PATH + 'date_limits.novx'))
 
+    def test_create_novx_sync_map(self):
+        copyfile(TEST_DATA_PATH + 'nv_aeon2.ini', INI_FILE)
+        copyfile(TEST_DATA_PATH + 'date_limits.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_AEON)
+        with open(TEST_AEONMAP, 'r', encoding='utf-8') as f:
+            guidsById = json.load(f)['guidsById']
+        jsonData = open_timeline(TEST_AEON)
+        guids = {e['guid'] for e in jsonData['events']}
+        guids.update(e['guid'] for e in jsonData['entities'])
+        self.assertTrue(guidsById)
+        self.assertLessEqual(set(guidsById.values()), guids)
+
     # @unittest.skip('')
     def test_update_novx(self):
         copyfile(TEST_DATA_PATH + 'nv_aeon2.ini', INI_FILE)
@@ -190,6 +232,14 @@ class NormalOperation(unittest.TestCase):
             copyfile(TEST_AEON, TEST_DATA_PATH + 'created_arc.aeonzip')
         self.assertEqual(open_timeline(TEST_AEON), open_timeline(TEST_DATA_PATH + 'created_arc.aeonzip'))
 
+    # @unittest.skip('')
+    def test_update_arc_aeon(self):
+        copyfile(TEST_DATA_PATH + 'arc.novx', TEST_NOVX)
+        copyfile(TEST_DATA_PATH + 'created_arc.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_NOVX)
+        self.assertEqual(open_timeline(TEST_AEON), open_timeline(TEST_DATA_PATH + 'created_arc.aeonzip'))
+
     # @unittest.skip('')
     def test_update_aeon(self):
         copyfile(TEST_DATA_PATH + 'updated.novx', TEST_NOVX)
@@ -210,6 +260,353 @@ class NormalOperation(unittest.TestCase):
             copyfile(TEST_AEON, TEST_DATA_PATH + 'updated1_from_yw.aeonzip')
         self.assertEqual(open_timeline(TEST_AEON), open_timeline(TEST_DATA_PATH + 'updated1_from_yw.aeonzip'))
 
+    # @unittest.skip('')
+    def test_update_aeon_unchanged(self):
+        copyfile(TEST_DATA_PATH + 'updated.novx', TEST_NOVX)
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_NOVX)
+        os.remove(TEST_AEON_BAK)
+        convert(TEST_NOVX)
+        self.assertFalse(os.path.isfile(TEST_AEON_BAK))
+        self.assertEqual(open_timeline(TEST_AEON), open_timeline(TEST_DATA_PATH + 'updated_from_yw.aeonzip'))
+
+    # @unittest.skip('')
+    def test_update_aeon_keeps_attachments(self):
+        copyfile(TEST_DATA_PATH + 'updated.novx', TEST_NOVX)
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        attachment = b'attachment data' * 1000
+        with zipfile.ZipFile(TEST_AEON, 'a', compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr('attachments/test.bin', attachment)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_NOVX)
+        self.assertEqual(open_timeline(TEST_AEON), open_timeline(TEST_DATA_PATH + 'updated_from_yw.aeonzip'))
+        with zipfile.ZipFile(TEST_AEON, 'r') as z:
+            self.assertEqual(z.read('attachments/test.bin'), attachment)
+
+    # @unittest.skip('')
+    def test_update_aeon_renamed_section(self):
+        copyfile(TEST_DATA_PATH + 'updated.novx', TEST_NOVX)
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_NOVX)
+        guids = {e['title']: e['guid'] for e in open_timeline(TEST_AEON)['events']}
+        novx = read_file(TEST_NOVX).replace('<Title>Day 0</Title>', '<Title>Day zero</Title>')
+        with open(TEST_NOVX, 'w', encoding='utf-8') as f:
+            f.write(novx)
+        convert(TEST_NOVX)
+        renamedGuids = {e['title']: e['guid'] for e in open_timeline(TEST_AEON)['events']}
+        self.assertNotIn('Day 0', renamedGuids)
+        self.assertEqual(renamedGuids['Day zero'], guids['Day 0'])
+        self.assertEqual(len(renamedGuids), len(guids))
+
+    def test_update_aeon_incremental(self):
+        copyfile(TEST_DATA_PATH + 'updated.novx', TEST_NOVX)
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_NOVX)
+        novx = read_file(TEST_NOVX).replace('<Time>22:00:00</Time>', '<Time>23:00:00</Time>')
+        with open(TEST_NOVX, 'w', encoding='utf-8') as f:
+            f.write(novx)
+        convert(TEST_NOVX)
+        incremental = open_timeline(TEST_AEON)
+        os.remove(TEST_AEONMAP)
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        convert(TEST_NOVX)
+        self.assertEqual(incremental, open_timeline(TEST_AEON))
+
+    def test_update_aeon_changed_events(self):
+        copyfile(TEST_DATA_PATH + 'updated.novx', TEST_NOVX)
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_NOVX)
+        novx = read_file(TEST_NOVX).replace('<Time>22:00:00</Time>', '<Time>23:00:00</Time>')
+        with open(TEST_NOVX, 'w', encoding='utf-8') as f:
+            f.write(novx)
+        converter = convert(TEST_NOVX)
+        self.assertEqual(converter.ui.infoHowText, f'{_("File written")}: "{norm_path(TEST_AEON)}" ({_("Changed events")}: 1).')
+
+    def test_update_aeon_created_and_deleted_events(self):
+        copyfile(TEST_DATA_PATH + 'updated.novx', TEST_NOVX)
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        convert(TEST_NOVX)
+        # Replace "Day 0" with a new section, and change "New scene".
+        novx = read_file(TEST_NOVX).replace('<SECTION id="sc4">', '<SECTION id="sc5">')
+        novx = novx.replace('<Title>Day 0</Title>', '<Title>Added scene</Title>')
+        novx = novx.replace('<Time>22:00:00</Time>', '<Time>23:00:00</Time>')
+        with open(TEST_NOVX, 'w', encoding='utf-8') as f:
+            f.write(novx)
+        converter = convert(TEST_NOVX)
+        self.assertEqual(converter.ui.infoHowText, f'{_("File written")}: "{norm_path(TEST_AEON)}" ({_("Changed events")}: 3).')
+        titles = [e['title'] for e in open_timeline(TEST_AEON)['events']]
+        self.assertIn('Added scene', titles)
+        self.assertNotIn('Day 0', titles)
+
+    def test_save_timeline_member(self):
+        jsonData = open_timeline(TEST_DATA_PATH + 'updated_from_yw.aeonzip')
+        os.chdir(TEST_EXEC_PATH)
+        compressedSizes = []
+        for compresslevel in (1, 9):
+            copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+            self.assertTrue(save_timeline(jsonData, TEST_AEON, compresslevel=compresslevel))
+            with zipfile.ZipFile(TEST_AEON, 'r') as z:
+                zinfo = z.getinfo('timeline.json')
+            self.assertEqual(zinfo.external_attr >> 16, 0o600)
+            self.assertLess(abs(datetime(*zinfo.date_time) - datetime.now()), timedelta(minutes=1))
+            compressedSizes.append(zinfo.compress_size)
+        self.assertLess(compressedSizes[1], compressedSizes[0])
+        self.assertFalse(save_timeline(jsonData, TEST_AEON, compresslevel=9))
+        self.assertEqual(open_timeline(TEST_AEON), jsonData)
+
+    def test_save_timeline_without_raw_copy(self):
+        copyfile(TEST_DATA_PATH + 'created.aeonzip', TEST_AEON)
+        attachment = b'attachment data' * 1000
+        with zipfile.ZipFile(TEST_AEON, 'a', compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr(zipfile.ZipInfo('attachments/test.bin', date_time=(2020, 1, 2, 3, 4, 6)), attachment, compress_type=zipfile.ZIP_BZIP2)
+        os.chdir(TEST_EXEC_PATH)
+        jsonData = open_timeline(TEST_DATA_PATH + 'updated_from_yw.aeonzip')
+        # Without the zipfile internals, the members are recompressed.
+        stripExtra = zipfile._strip_extra
+        del zipfile._strip_extra
+        try:
+            self.assertTrue(save_timeline(jsonData, TEST_AEON))
+        finally:
+            zipfile._strip_extra = stripExtra
+        with zipfile.ZipFile(TEST_AEON, 'r') as z:
+            self.assertIsNone(z.testzip())
+            self.assertEqual(z.read('attachments/test.bin'), attachment)
+            zinfo = z.getinfo('attachments/test.bin')
+        self.assertEqual(zinfo.compress_type, zipfile.ZIP_BZIP2)
+        self.assertEqual(zinfo.date_time, (2020, 1, 2, 3, 4, 6))
+        self.assertEqual(open_timeline(TEST_AEON), jsonData)
+
+    def test_compression_level_out_of_range(self):
+        copyfile(TEST_DATA_PATH + 'updated_from_yw.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        kwargs = {}
+        kwargs.update(SETTINGS)
+        kwargs.update(OPTIONS)
+        kwargs['nv_service'] = NvService()
+        kwargs['compression_level'] = '12'
+        timeline = JsonTimeline2(TEST_AEON, **kwargs)
+        timeline.update_moon_phases()
+        with zipfile.ZipFile(TEST_AEON, 'r') as z:
+            self.assertEqual(z.getinfo('timeline.json').compress_type, zipfile.ZIP_DEFLATED)
+            self.assertIsNone(z.testzip())
+
+    def test_check_overlaps(self):
+        copyfile(TEST_DATA_PATH + 'updated_from_yw.aeonzip', TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        jsonData = open_timeline(TEST_AEON)
+        entities = {e['name']: e for e in jsonData['entities']}
+        events = {e['title']: e for e in jsonData['events']}
+        roles = {r['entity']: r['role'] for r in events['NaNoWriMo 2021']['relationships']}
+        london = dict(entities['Santa Barbara'], guid='London-GUID', name='London')
+        jsonData['entities'].append(london)
+
+        def relate(title, *entityNames):
+            for name in entityNames:
+                guid = entities[name]['guid'] if name in entities else london['guid']
+                role = roles.get(guid, roles[entities['Santa Barbara']['guid']])
+                events[title]['relationships'].append({'entity': guid, 'percentAllocated': 1, 'role': role})
+
+        # Poirot is in Santa Barbara for 30 days, but in London in between.
+        relate('Narrative event', 'Poirot', 'London')
+        # B.C. Toyle stays in Santa Barbara.
+        relate('Day 0', 'B.C. Toyle', 'Santa Barbara')
+        # Events without location are not checked.
+        relate('New scene', 'B.C. Toyle')
+        with zipfile.ZipFile(TEST_AEON, 'w') as myzip:
+            myzip.writestr('timeline.json', json.dumps(jsonData))
+        kwargs = {}
+        kwargs.update(SETTINGS)
+        kwargs.update(OPTIONS)
+        kwargs['nv_service'] = NvService()
+        timeline = JsonTimeline2(TEST_AEON, **kwargs)
+        self.assertEqual(timeline.check_overlaps(), [('Poirot', 'NaNoWriMo 2021', 'Narrative event')])
+        self.assertEqual(open_timeline(TEST_AEON), jsonData)
+
+    @unittest.skipIf(overlap_checker.np is None, 'NumPy is not available')
+    def test_overlap_checker_vectorized(self):
+        rand = random.Random(2)
+        checker = OverlapChecker()
+        events = {}
+        for eventIndex in range(400):
+            start = 63000000000 + rand.randrange(50) * 3600
+            end = start + rand.choice((0, 0, 1, 1800, 3600, 7200, 36000))
+            # Many events start at the same time, or have no duration.
+            characterGuids = rand.sample(('A', 'B', 'C', 'D'), rand.randrange(4))
+            locationGuids = rand.sample(('L1', 'L2', 'L3', 'L4', 'L5'), rand.choice((0, 1, 1, 1, 2, 3)))
+            # Some events have no location, some have several ones.
+            checker.add_event(eventIndex, start, end, characterGuids, locationGuids)
+            if locationGuids:
+                events[eventIndex] = (start, max(end, start + 1), set(characterGuids), set(locationGuids))
+        overlaps = checker._get_overlaps_by_bisection()
+        self.assertEqual(checker._get_overlaps_vectorized(), overlaps)
+        self.assertEqual(len(set(overlaps)), len(overlaps))
+        expected = set()
+        for i, (start, end, characters, locations) in events.items():
+            for j, (otherStart, otherEnd, otherCharacters, otherLocations) in events.items():
+                if i != j and (start, i) <= (otherStart, j) and otherStart < end and locations.isdisjoint(otherLocations):
+                    expected.update((guid, i, j) for guid in characters & otherCharacters)
+        self.assertEqual(set(overlaps), expected)
+        self.assertEqual(OverlapChecker()._get_overlaps_vectorized(), [])
+
+    def test_timestamp_converter(self):
+        maxTimestamp = TimestampConverter.MAX_TIMESTAMP
+        rand = random.Random(14)
+        timestamps = [
+            int(JsonTimeline2.DATE_LIMIT),
+            int(JsonTimeline2.DATE_LIMIT) + 1,
+            86399,
+            86400,
+            TimestampConverter().get_timestamp('1600-02-29T23:59:59'),
+            TimestampConverter().get_timestamp('1900-03-01'),
+            maxTimestamp - 86400,
+            maxTimestamp - 1,
+            maxTimestamp,
+        ] + [rand.randrange(maxTimestamp) for __ in range(1000)]
+        invalidTimestamps = [-1, maxTimestamp + 1, JsonTimeline2.DATE_LIMIT + 0.5, None]
+        numpy = timestamp_converter.np
+        try:
+            for timestamp_converter.np in {None, numpy}:
+                converter = TimestampConverter()
+                converter.convert_all(timestamps + invalidTimestamps + timestamps)
+                self.assertEqual(set(converter._datetimes), set(timestamps))
+                for timestamp in timestamps:
+                    dt = converter.get_datetime(timestamp)
+                    self.assertIs(type(dt), datetime)
+                    self.assertEqual(dt, datetime.min + timedelta(seconds=timestamp))
+                    self.assertEqual(converter.get_iso_date_time(timestamp), tuple(dt.isoformat().split('T')))
+                    self.assertEqual(converter.get_timestamp(dt.isoformat()), timestamp)
+                self.assertEqual(converter.get_iso_date_time(maxTimestamp), ('9999-12-31', '23:59:59'))
+                self.assertEqual(converter.get_iso_date_time(JsonTimeline2.DATE_LIMIT), ('0001-01-01', '00:00:00'))
+                for timestamp in (-1, maxTimestamp + 1):
+                    with self.assertRaises(OverflowError):
+                        converter.get_datetime(timestamp)
+        finally:
+            timestamp_converter.np = numpy
+
+    def test_event_store(self):
+        rand = random.Random(23)
+        events = []
+        for i in range(500):
+            jsonEvent = {'guid': f'g{i}', 'title': f'Event {i}', 'displayId': rand.choice([None, 'x', rand.randrange(50)])}
+            if rand.random() < 0.8:
+                jsonEvent['rangeValues'] = [{'rangeProperty': 'date', 'position': {'timestamp': rand.randrange(-5, 20)}}]
+            events.append(EventRecord(jsonEvent))
+        store = EventStore()
+        store.build(events, 'date', TimestampConverter())
+        timestamps = [store.timestamps[i] or 0 for i in range(len(events))]
+        for indices in (range(len(events)), rand.sample(range(len(events)), 50), [], [3]):
+            self.assertEqual(store.sort_chronologically(indices), sorted(sorted(indices), key=timestamps.__getitem__))
+            self.assertEqual(store.get_max_timestamp(indices), max((timestamps[i] for i in indices), default=0))
+            displayIds = [store.displayIds[i] for i in indices if store.displayIds[i] is not None]
+            self.assertEqual(store.get_max_display_id(indices), max(displayIds, default=0.0))
+
+    def test_json_stream_reader(self):
+        jsonData = {
+            'events': [
+                {'title': 'Café "{[" }, {', 'values': [{'x': -1.5e-07}, {'y': [1, 2]}]},
+                {'title': '},\n   {', 'notes': 'ü' * 40},
+                {},
+                {'title': 'Last', 'priority': 500},
+            ],
+            'tags': ['a', 'b'],
+            'template': {'rangeProperties': [], 'notes': 'x' * 70},
+            'version': 123456,
+        }
+        os.chdir(TEST_EXEC_PATH)
+        save_timeline(jsonData, TEST_AEON)
+        with zipfile.ZipFile(TEST_AEON, 'r') as z:
+            texts = [
+                json.dumps(jsonData),
+                json.dumps(jsonData, indent=3, separators=(',', ' : '), ensure_ascii=False),
+                z.read('timeline.json').decode('utf-8'),
+            ]
+        chunkSize = JsonStreamReader.CHUNK_SIZE
+        try:
+            for text in texts:
+                jsonBytes = text.encode('utf-8')
+                for JsonStreamReader.CHUNK_SIZE in (1, 2, 3, 5, 8, 13, 64, chunkSize):
+                    self.assertEqual(dict(JsonStreamReader(BytesIO(jsonBytes)).items()), jsonData)
+                    for invalidBytes in (jsonBytes[:-1], jsonBytes + b' {}', jsonBytes.replace(b'500', b'500 1')):
+                        with self.assertRaises(JSONDecodeError):
+                            dict(JsonStreamReader(BytesIO(invalidBytes)).items())
+        finally:
+            JsonStreamReader.CHUNK_SIZE = chunkSize
+        self.assertEqual(dict(JsonStreamReader(BytesIO(b' ')).items()), {})
+
+    def test_open_timeline_lazy(self):
+        for fileName in ('normal.aeonzip', 'date_limits.aeonzip', 'minimal.aeonzip'):
+            jsonData = open_timeline_lazy(TEST_DATA_PATH + fileName)
+            self.assertEqual(list(jsonData), list(open_timeline(TEST_DATA_PATH + fileName)))
+            jsonData['events'] = list(jsonData['events'])
+            self.assertEqual(jsonData, open_timeline(TEST_DATA_PATH + fileName))
+        kwargs = {}
+        kwargs.update(SETTINGS)
+        kwargs.update(OPTIONS)
+        kwargs['nv_service'] = NvService()
+        timeline = JsonTimeline2(TEST_DATA_PATH + 'normal.aeonzip', **kwargs)
+        self.assertEqual(timeline.count_events(), 94)
+
+    def test_lazy_event_list(self):
+        events = [
+            {'title': 'Café "Ärger" [1]', 'tags': ['{', '}']},
+            {'title': 'Back\\slash\\', 'notes': 'Quote \\"{[ and \\\\"'},
+            {'title': 'Empty', 'values': [[], {}]},
+            {'title': '日本語 }]', 'values': [{'x': '"]'}]},
+        ]
+        text = f'{{"events" : [ {json.dumps(events, ensure_ascii=False)[1:]}, "end": 1}}'
+        start = text.index('[')
+        end = text.index(', "end"')
+        chunkSize = LazyEventList.CHUNK_SIZE
+        try:
+            for LazyEventList.CHUNK_SIZE in range(1, len(text.encode('utf-8')) + 2):
+                for jsonBytes in (None, text.encode('utf-8')):
+                    if jsonBytes is not None and lazy_event_list.np is None:
+                        continue
+
+                    eventList = LazyEventList(text, start, jsonBytes)
+                    self.assertEqual(list(eventList), events)
+                    self.assertEqual(eventList.end, end)
+                    self.assertEqual(eventList[1:3], events[1:3])
+                    with self.assertRaises(JSONDecodeError):
+                        LazyEventList(text[:end - 1], start, None if jsonBytes is None else text[:end - 1].encode('utf-8'))
+        finally:
+            LazyEventList.CHUNK_SIZE = chunkSize
+
+    def test_lazy_event_list_layouts(self):
+        events = [{'title': f'Event {i}', 'values': [{'x': [i, {'y': '},\n{'}]}], 'tags': []} for i in range(5)]
+        entities = [{'name': 'A', 'notes': ']'}, {'name': 'B', 'roles': [{}, {}]}]
+        for eventList in (events, events[:1], []):
+            for jsonData in (
+                {'entities': entities, 'events': eventList, 'version': 1},
+                {'events': eventList, 'entities': entities, 'tags': ['a', 'b']},
+            ):
+                texts = []
+                for indent in (None, 0, 3, '\t'):
+                    for separators in ((', ', ': '), (',', ' : ')):
+                        texts.append(json.dumps(jsonData, indent=indent, separators=separators))
+                texts.append(texts[-1].replace('\n', '\r\n'))
+                for text in texts:
+                    start = text.index('[', text.index('"events"'))
+                    end = json.JSONDecoder().raw_decode(text, start)[1]
+                    for jsonBytes in (None, text.encode('utf-8')):
+                        if jsonBytes is not None and lazy_event_list.np is None:
+                            continue
+
+                        lazyList = LazyEventList(text, start, jsonBytes)
+                        self.assertEqual(list(lazyList), eventList)
+                        self.assertEqual(lazyList.end, end)
+                os.chdir(TEST_EXEC_PATH)
+                save_timeline(jsonData, TEST_AEON)
+                lazyData = open_timeline_lazy(TEST_AEON)
+                lazyData['events'] = list(lazyData['events'])
+                self.assertEqual(lazyData, jsonData)
+                os.remove(TEST_AEON)
+
     # @unittest.skip('')
     def test_create_novx_birthday(self):
         copyfile(TEST_DATA_PATH + 'nv_aeon2.ini', INI_FILE)
@@ -252,6 +649,62 @@ class NormalOperation(unittest.TestCase):
         self.assertNotEqual(self.test_err.getvalue().strip(), value)
 
 
+class ScalingBehavior(unittest.TestCase):
+    """Test case: Many elements are processed without repeated lookups."""
+
+    def get_timeline(self):
+        kwargs = {}
+        kwargs.update(SETTINGS)
+        kwargs.update(OPTIONS)
+        kwargs['nv_service'] = NvService()
+        timeline = JsonTimeline2(TEST_AEON, **kwargs)
+        timeline.novel = kwargs['nv_service'].new_novel()
+        return timeline
+
+    # @unittest.skip('')
+    def test_put_new_sections_into_new_chapter(self):
+        timeline = self.get_timeline()
+        nvService = timeline._nvSvc
+        tree = timeline.novel.tree
+        timeline.novel.chapters['ch1'] = nvService.new_chapter(title='ch1')
+        tree.append(CH_ROOT, 'ch1')
+        srtScIds = []
+        newScIds = []
+        for i in range(40000):
+            scId = f'sc{i + 1}'
+            timeline.novel.sections[scId] = nvService.new_section(title=scId, scType=0)
+            srtScIds.append(scId)
+            if i % 2:
+                tree.append('ch1', scId)
+            else:
+                newScIds.append(scId)
+        srtScIds.reverse()
+        newScIds.reverse()
+        # the later a section is created, the earlier its date
+        oldScIds = list(tree.get_children('ch1'))
+
+        # The chapters are read once, not once per section.
+        parents = []
+        get_children = tree.get_children
+
+        def count_children_calls(parent):
+            parents.append(parent)
+            return get_children(parent)
+
+        tree.get_children = count_children_calls
+        try:
+            timeline._r_put_new_sections_into_new_chapter(srtScIds)
+        finally:
+            tree.get_children = get_children
+        self.assertEqual(parents, [CH_ROOT, 'ch1'])
+
+        chIds = tree.get_children(CH_ROOT)
+        self.assertEqual(len(chIds), 2)
+        self.assertEqual(timeline.novel.chapters[chIds[1]].title, _('New sections'))
+        self.assertEqual(tree.get_children(chIds[1]), newScIds)
+        self.assertEqual(tree.get_children('ch1'), oldScIds)
+
+
 def main():
     unittest.main()
 
@@ -0,0 +1,66 @@
+"""Compare the timeline compression settings in terms of size and time.
+
+usage: benchmark_compression.py [aeonzip files]
+
+If no files are given, the test corpus is used.
+
+Copyright (c) Peter Triesberger
+For further information see https://github.com/peter88213/nv_aeon2
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import glob
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, f'{os.getcwd()}/../../novelibre/src')
+sys.path.insert(0, f'{os.getcwd()}/../src')
+from nvaeon2.aeon2_fop import open_timeline
+from nvaeon2.aeon2_fop import save_timeline
+
+TEST_CORPUS = f'{os.getcwd()}/../test/data/*.aeonzip'
+REPETITIONS = 20
+SETTINGS = [
+    ('stored', zipfile.ZIP_STORED, None),
+    ('deflated 1', zipfile.ZIP_DEFLATED, 1),
+    ('deflated 3', zipfile.ZIP_DEFLATED, 3),
+    ('deflated 6', zipfile.ZIP_DEFLATED, 6),
+    ('deflated 9', zipfile.ZIP_DEFLATED, 9),
+]
+
+
+def main(filePaths):
+    timelines = [open_timeline(filePath) for filePath in filePaths]
+    print(f'{len(timelines)} timeline(s), {REPETITIONS} repetitions each\n')
+    print(f'{"Setting":<12}{"Size/bytes":>14}{"Time/ms":>12}')
+    with tempfile.TemporaryDirectory() as tempDir:
+        targetPath = f'{tempDir}/benchmark.aeonzip'
+        for name, compression, compresslevel in SETTINGS:
+            totalSize = 0
+            totalTime = 0.0
+            for jsonData in timelines:
+                for __ in range(REPETITIONS):
+                    if os.path.isfile(targetPath):
+                        os.remove(targetPath)
+                    start = time.perf_counter()
+                    save_timeline(
+                        jsonData,
+                        targetPath,
+                        compression=compression,
+                        compresslevel=compresslevel,
+                    )
+                    totalTime += time.perf_counter() - start
+                totalSize += os.path.getsize(targetPath)
+            print(
+                f'{name:<12}{totalSize:>14}'
+                f'{totalTime * 1000 / REPETITIONS:>12.2f}'
+            )
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        main(sorted(glob.glob(TEST_CORPUS)))